@@ -0,0 +1,139 @@
+"""Benchmark the crawled-page cleaner against the original multi-pass implementation.
+
+Run from the repository root:
+
+    python benchmarks/bench_content_cleaner.py
+
+Pages are built from a job-posting template in the shape crawl4ai produces for
+LinkedIn / Greenhouse postings, scaled up by repeating the body. Two variants are
+measured: a typical page, and an adversarial one with few blank lines, an unclosed
+<footer> tag and many boilerplate phrases, which is where the old patterns blew up.
+"""
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.content_cleaner import clean_crawled_content  # noqa: E402
+
+
+JOB_PAGE = """# Senior Backend Engineer
+
+Acme Robotics · San Francisco, CA (Hybrid) · 2 weeks ago · Over 200 applicants
+
+[Apply](https://jobs.example.com/apply/123) [Save](https://jobs.example.com/save/123)
+
+## About the job
+
+Acme Robotics builds autonomous warehouse systems used by more than 300 fulfilment
+centres. Our platform team owns the services that route millions of picks per day.
+
+## Responsibilities
+
+- Design, build and operate high-throughput Python and Go services
+- Own reliability of the order-routing pipeline end to end
+- Partner with robotics and data teams on new capabilities
+- Mentor engineers and lead design reviews
+
+## Qualifications
+
+- 5+ years building distributed backend systems
+- Strong experience with PostgreSQL, Kafka and Kubernetes
+- Comfortable debugging production issues under pressure
+
+## Benefits
+
+Competitive salary, equity, medical/dental/vision, 401(k) match and flexible PTO.
+
+Share this job on [linkedin.com](https://linkedin.com/share) or twitter.com
+
+Cookie Policy: we use cookies to improve your experience. See our Privacy Policy.
+
+Copyright © 2025 Acme Robotics. All rights reserved.
+
+
+
+"""
+
+ADVERSARIAL_CHUNK = (
+    "<footer class=\"site\">Contact us · cookie policy · privacy policy · terms of use\n"
+    "Follow us on facebook.com and youtube.com\n"
+)
+
+
+def legacy_clean(content: str) -> str:
+    """The original implementation, kept here as the reference for output and timing"""
+    footer_patterns = [
+        r'(?i)<footer.*?>.*?</footer>',
+        r'(?i)<!-- footer.*?-->.*?<!-- end footer -->',
+        r'(?i)---+\s*footer\s*---+.*?(?=\n\n|\Z)',
+        r'(?i)## footer.*?(?=\n##|\Z)',
+    ]
+    for pattern in footer_patterns:
+        content = re.sub(pattern, '', content, flags=re.DOTALL)
+
+    unwanted_sections = [
+        r'(?i)<nav.*?>.*?</nav>',
+        r'(?i)cookie policy.*?(?=\n\n|\Z)',
+        r'(?i)privacy policy.*?(?=\n\n|\Z)',
+        r'(?i)terms of (use|service).*?(?=\n\n|\Z)',
+        r'(?i)copyright ©.*?(?=\n\n|\Z)',
+        r'(?i)all rights reserved.*?(?=\n\n|\Z)',
+        r'(?i)follow us on.*?(?=\n\n|\Z)',
+        r'(?i)share this job.*?(?=\n\n|\Z)',
+    ]
+    for pattern in unwanted_sections:
+        content = re.sub(pattern, '', content, flags=re.DOTALL)
+
+    content = re.sub(r'(?i)(facebook|twitter|linkedin|instagram|youtube)\.com', '', content)
+    content = re.sub(r'\n{3,}', '\n\n', content)
+    return content.strip()
+
+
+def build_page(target_bytes: int, adversarial: bool) -> str:
+    chunk = ADVERSARIAL_CHUNK if adversarial else JOB_PAGE
+    repeats = max(1, target_bytes // len(chunk))
+    return chunk * repeats
+
+
+# Stop timing the legacy cleaner once a single run exceeds this many seconds
+LEGACY_TIME_BUDGET = 2.0
+
+
+def time_call(func, content: str, repeat: int = 3):
+    """Return (best wall time, output) over several runs"""
+    best = float('inf')
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(content)
+        best = min(best, time.perf_counter() - start)
+    return best, output
+
+
+def main() -> None:
+    sizes = [25_000, 50_000, 100_000, 200_000, 400_000, 800_000]
+    for adversarial in (False, True):
+        label = "adversarial page" if adversarial else "typical job page"
+        print(f"\n{label}")
+        print(f"{'size (KB)':>10} {'legacy (ms)':>12} {'compiled (ms)':>14} {'compiled us/KB':>15} {'same output':>12}")
+        run_legacy = True
+        for size in sizes:
+            page = build_page(size, adversarial)
+            new_time, new_output = time_call(clean_crawled_content, page)
+            kb = len(page) / 1024
+            if run_legacy:
+                legacy_time, legacy_output = time_call(legacy_clean, page, repeat=1)
+                legacy_column = f"{legacy_time * 1000:>12.1f}"
+                same_column = str(legacy_output == new_output)
+                run_legacy = legacy_time < LEGACY_TIME_BUDGET
+            else:
+                legacy_column, same_column = f"{'skipped':>12}", "-"
+            print(f"{kb:>10.0f} {legacy_column} {new_time * 1000:>14.2f} "
+                  f"{new_time * 1e6 / kb:>15.2f} {same_column:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Benchmark the crawler end to end against local fixture pages, with no network access.
+
+Run from the repository root:
+
+    python benchmarks/bench_crawler.py [--requests 50] [--concurrency 1,2,4,8] [--rate 0] [--browser]
+
+A FixtureServer (see fixture_server.py) serves recorded LinkedIn-like, Greenhouse-like,
+JavaScript-rendered and blocked pages on 127.0.0.1. Every scenario uses a fresh
+WebCrawler with its own temporary cache directory, so runs are reproducible.
+
+Reported per scenario: p50/p95 latency, throughput, and peak RSS of the process so far.
+By default the browser fallback is disabled, so JS-rendered and blocked pages measure the
+plain HTTP path and the fallback handling; pass --browser to include headless browser
+launches (requires Playwright browsers to be installed; the pages are still local).
+The per-domain rate limiter throttles everything on 127.0.0.1 like one job board;
+--rate sets its requests per second, and 0 disables it to measure raw crawler overhead.
+"""
+import argparse
+import contextlib
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import ROUTES, FixtureServer  # noqa: E402
+from src.utils import web_crawler as web_crawler_module  # noqa: E402
+from src.utils.rate_limiter import DomainRateLimiter  # noqa: E402
+from src.utils.web_crawler import WebCrawler  # noqa: E402
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def report(name: str, samples: List[float], elapsed: Optional[float] = None) -> None:
+    elapsed = elapsed if elapsed is not None else sum(samples)
+    throughput = len(samples) / elapsed if elapsed else float('inf')
+    print(f"{name:<44} {percentile(samples, 50) * 1000:>9.2f} {percentile(samples, 95) * 1000:>9.2f} "
+          f"{throughput:>10.1f} {peak_rss_mb():>9.1f}")
+
+
+def time_each(func: Callable[[str], object], inputs: List[str]) -> List[float]:
+    samples = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the crawler's progress prints, including those from its loop thread"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def make_crawler(args: argparse.Namespace, concurrency: Optional[int] = None):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        crawler = WebCrawler(cache_dir=Path(cache_dir), browser_fallback=args.browser)
+        if args.rate <= 0:
+            crawler._rate_limiter = DomainRateLimiter(rate=1e9, capacity=1e9)
+        else:
+            crawler._rate_limiter = DomainRateLimiter(rate=args.rate, capacity=args.rate * 2)
+        if concurrency:
+            crawler.max_concurrent = concurrency
+            crawler.max_per_domain = concurrency
+        try:
+            yield crawler
+        finally:
+            with quiet():
+                crawler.close()
+
+
+def bench_single(server: FixtureServer, args: argparse.Namespace) -> List[str]:
+    """crawl_url and fetch_job_description, cold and warm, per fixture; returns crawled pages"""
+    pages = []
+    for kind in ROUTES:
+        with make_crawler(args) as crawler:
+            cold_urls = [server.url(kind, f"cold-{i}") for i in range(args.requests)]
+            with quiet():
+                cold = time_each(lambda url: crawler.submit(crawler.crawl_url(url)).result(), cold_urls)
+                warm = time_each(lambda url: crawler.submit(crawler.crawl_url(url)).result(), cold_urls)
+                pages.append(crawler.submit(crawler.crawl_url(cold_urls[0])).result())
+            report(f"crawl_url {kind} (cold)", cold)
+            report(f"crawl_url {kind} (cached)", warm)
+
+        with make_crawler(args) as crawler:
+            urls = [server.url(kind, f"sync-{i}") for i in range(args.requests)]
+            with quiet():
+                cold = time_each(crawler.fetch_job_description, urls)
+                warm = time_each(crawler.fetch_job_description, urls)
+            report(f"fetch_job_description {kind} (cold)", cold)
+            report(f"fetch_job_description {kind} (cached)", warm)
+    return pages
+
+
+def bench_concurrency(server: FixtureServer, args: argparse.Namespace) -> None:
+    """Bulk crawls of a mixed batch through crawl_many at several concurrency caps"""
+    kinds = list(ROUTES)
+    for level in args.concurrency:
+        with make_crawler(args, concurrency=level) as crawler:
+            urls = [server.url(kinds[i % len(kinds)], f"bulk-{i}") for i in range(args.requests * 2)]
+
+            async def crawl_all() -> List[float]:
+                start = time.perf_counter()
+                done = []
+                async for _ in crawler.crawl_many(urls):
+                    done.append(time.perf_counter() - start)
+                return done
+
+            with quiet():
+                start = time.perf_counter()
+                completion_times = crawler.submit(crawl_all()).result()
+                elapsed = time.perf_counter() - start
+            report(f"crawl_many x{len(urls)} concurrency={level} (done at)", completion_times, elapsed)
+
+
+def bench_cleaners(pages: List[str], args: argparse.Namespace) -> None:
+    """The cleaning steps on the markdown the crawler produced for each fixture"""
+    pages = [page for page in pages if page and not page.startswith("Error")]
+    inputs = pages * max(1, args.requests // max(1, len(pages)))
+    with tempfile.TemporaryDirectory() as store_dir, quiet():
+        crawler = WebCrawler(cache_dir=Path(store_dir), browser_fallback=False)
+        # Keep the benchmark's cleaned copies out of the real cache directory
+        web_crawler_module._cleaned_store.directory = Path(store_dir)
+        clean_for_cache = time_each(crawler._clean_content_for_cache, inputs)
+        clean_description = time_each(WebCrawler.clean_job_description, inputs)
+        web_crawler_module._cleaned_store.writer.flush()
+        crawler.close()
+    report("_clean_content_for_cache", clean_for_cache)
+    report("clean_job_description", clean_description)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--requests', type=int, default=50, help="requests per scenario")
+    parser.add_argument('--concurrency', default='1,2,4,8',
+                        type=lambda value: [int(level) for level in value.split(',')],
+                        help="comma-separated concurrency caps for crawl_many")
+    parser.add_argument('--rate', type=float, default=0,
+                        help="per-domain requests per second (0 disables rate limiting)")
+    parser.add_argument('--browser', action='store_true', help="allow the headless browser fallback")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<44} {'p50 (ms)':>9} {'p95 (ms)':>9} {'req/s':>10} {'RSS (MB)':>9}")
+    with FixtureServer() as server:
+        pages = bench_single(server, args)
+        bench_concurrency(server, args)
+    bench_cleaners(pages, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Local HTTP server that serves recorded job pages, so crawler benchmarks need no network.
+
+Routes (any suffix after the prefix is accepted, so every request can use a distinct
+URL and miss the crawl cache):
+
+    /linkedin/...    LinkedIn-like guest job view (plain HTML)
+    /greenhouse/...  Greenhouse-like board page with a JSON-LD JobPosting
+    /js/...          JavaScript-rendered shell that needs a browser
+    /blocked/...     403 "access denied" page, as served by bot protection
+
+Pages are served with an ETag and honour If-None-Match, so revalidation paths can be
+measured too. Run it on its own with:
+
+    python benchmarks/fixture_server.py [port]
+"""
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Route prefix -> (fixture file, status code)
+ROUTES: Dict[str, Tuple[str, int]] = {
+    'linkedin': ('linkedin_job.html', 200),
+    'greenhouse': ('greenhouse_job.html', 200),
+    'js': ('js_rendered.html', 200),
+    'blocked': ('blocked.html', 403),
+}
+
+
+def _load_fixtures() -> Dict[str, Tuple[bytes, str, int]]:
+    pages = {}
+    for prefix, (name, status) in ROUTES.items():
+        body = (FIXTURES_DIR / name).read_bytes()
+        pages[prefix] = (body, '"' + hashlib.md5(body).hexdigest() + '"', status)
+    return pages
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    pages: Dict[str, Tuple[bytes, str, int]] = {}
+
+    def do_GET(self) -> None:
+        prefix = self.path.lstrip('/').split('/', 1)[0].split('?', 1)[0]
+        page = self.pages.get(prefix)
+        if page is None:
+            self.send_error(404)
+            return
+        body, etag, status = page
+
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # Keep benchmark output readable
+        pass
+
+
+class FixtureServer:
+    """Fixture server running on a background thread; usable as a context manager"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        FixtureHandler.pages = _load_fixtures()
+        self._server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FixtureServer", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, kind: str, name: str = 'job') -> str:
+        return f"{self.base_url}/{kind}/{name}"
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = FixtureServer(port=port)
+    print(f"Serving fixtures on {server.base_url} (Ctrl+C to stop)")
+    for prefix in ROUTES:
+        print(f"  {server.url(prefix)}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -14,11 +14,15 @@ from ..utils.generators.linkedin_dm_generator import LinkedInDMGenerator
 from ..utils.generators.referral_dm_generator import ReferralDMGenerator
 from ..utils.generators.resume_builder import ResumeBuilder
 from ..utils.generators.resume_processor import ResumeProcessor
+from ..utils.generators.candidate_profile_generator import CandidateProfileGenerator
 from ..utils.web_crawler import WebCrawler
 from ..utils.generators.chatbot_generator import ChatbotGenerator  # Add this import
 from ..ui.components import create_header, create_resume_section, create_job_details_section, create_features_section, create_chat_interface
 from ..ui.event_handlers import setup_event_handlers
 from src.utils.job_extractor import JobDetailsExtractor
+from src.utils.application_context import ApplicationContext
+from src.utils.prompt_budget import fit_resume_and_job
+from src.utils.metrics import get_metrics
 
 class Applicator:
     """Main application class"""
@@ -47,7 +51,8 @@ class Applicator:
 
         # Initialize components
         self.resume_processor = ResumeProcessor()
-        self.cover_letter_generator = CoverLetterGenerator()
+        self.profile_generator = CandidateProfileGenerator()
+        self.cover_letter_generator = CoverLetterGenerator(cache_expiry=CACHE_EXPIRY)
         self.qna_generator = JobApplicationQnA()
         self.pdf_generator = PDFGenerator()
         self.web_crawler = WebCrawler()
@@ -57,9 +62,12 @@ class Applicator:
         self.resume_builder = ResumeBuilder()  # Add the resume builder
         self.job_extractor = JobDetailsExtractor()
         self.chatbot_generator = ChatbotGenerator()  # Add this line
+        get_metrics().start_periodic_dump()  # Write metrics.json / metrics.prom to src/data/metrics
         self.temp_cover_letter = None
         self.temp_resume_content = None
+        self.temp_candidate_profile = None  # Compact profile of the resume, sent to the generators instead of it
         self.temp_job_description = None
+        self.application_context = None  # Resume + job description shared by the follow-up generators
         self.questions_answers = []
         self.company_name = None
         self.position_name = None
@@ -94,13 +102,37 @@ class Applicator:
                 f.write(cover_letter)
             return str(simple_file_path)
 
+    def _get_application_context(self):
+        """Return the shared context for the current resume and job description, (re)creating it if they changed"""
+        if not self.temp_resume_content or not self.temp_job_description:
+            return None
+        context = self.application_context
+        if context is None or not context.matches(self._candidate_profile(), self.temp_job_description):
+            if context is not None:
+                context.close()
+            context = self.application_context = ApplicationContext(self._candidate_profile(), self.temp_job_description)
+        return context
+
+    def _candidate_profile(self):
+        """The resume as the generators see it: its compact profile, or the extracted text if there is none"""
+        return self.temp_candidate_profile or self.temp_resume_content
+
     def crawl_job_description(self, job_url):
         """Crawl job description from URL"""
         if not job_url:
             return ""
         return self.web_crawler.fetch_job_description(job_url)
 
-    def app_workflow(self, resume_file, selected_resume, job_description, job_url, company_name, position_name, progress=gr.Progress()):
+    def prefetch_job_url(self, job_url):
+        """Start crawling the job URL in the background as soon as it is entered"""
+        self.web_crawler.prefetch(job_url)
+
+    def regenerate_workflow(self, resume_file, selected_resume, job_description, job_url, company_name, position_name, progress=gr.Progress()):
+        """Run the main workflow, bypassing the cover letter cache"""
+        yield from self.app_workflow(resume_file, selected_resume, job_description, job_url, company_name, position_name,
+                                     use_cache=False, progress=progress)
+
+    def app_workflow(self, resume_file, selected_resume, job_description, job_url, company_name, position_name, use_cache=True, progress=gr.Progress()):
         """Main workflow for the application"""
         # Store company and position names
         self.company_name = company_name
@@ -120,12 +152,14 @@ class Applicator:
 
         if not resume_path:
             gr.Warning("⚠️ No resume provided")
-            return "Please upload or select a resume."
+            yield "Please upload or select a resume."
+            return
 
         # Check if company name and position name are provided
         if not company_name or not position_name:
             gr.Warning("⚠️ Company name and position name are required")
-            return "Please provide both company name and position name."
+            yield "Please provide both company name and position name."
+            return
             
         # Store company and position names
         self.company_name = company_name
@@ -138,7 +172,8 @@ class Applicator:
         resume_content = self.resume_processor.extract_text(resume_path)
         if resume_content.startswith("Error"):
             gr.Warning(f"❌ Error processing resume: {resume_content}")
-            return resume_content
+            yield resume_content
+            return
         
         # Get job description (either from text input or by crawling URL)
         final_job_description = job_description
@@ -148,7 +183,8 @@ class Applicator:
             crawled_content = self.crawl_job_description(job_url)
             if crawled_content.startswith("Error"):
                 gr.Warning(f"❌ Error crawling job description: {crawled_content}")
-                return crawled_content
+                yield crawled_content
+                return
             
             progress(0.4, desc="Processing job description...")
             final_job_description = self.web_crawler.clean_job_description(crawled_content)
@@ -157,37 +193,46 @@ class Applicator:
             if (len(final_job_description.lower().split())) < 50:
                 gr.Warning("⚠️ Failed to crawl job posting. Please verify the URL is correct and accessible.")
                 gr.Warning("⚠️ To proceed, please manually copy and paste the job description from the original posting.")
-                return "Error: Not enough content found in job description. Please verify the URL or paste the description manually."
+                yield "Error: Not enough content found in job description. Please verify the URL or paste the description manually."
+                return
         
         elif not final_job_description or final_job_description.strip() == "":
             gr.Warning("⚠️ No job description provided")
-            return "Please provide a job description or a valid job posting URL."
+            yield "Please provide a job description or a valid job posting URL."
+            return
         
         # Store resume and job description for QnA feature
         self.temp_resume_content = resume_content
         self.temp_job_description = final_job_description
         
+        # Distil the resume into a compact profile once; every generator uses it instead of the raw text
+        progress(0.5, desc="Building candidate profile...")
+        self.temp_candidate_profile = self.profile_generator.get_profile(resume_content)
+        
         # Generate cover letter
         # gr.Info("✍️ Generating cover letter...")
         progress(0.7, desc="Generating cover letter...")
-        cover_letter = self.cover_letter_generator.generate_cover_letter(
-            resume_content, final_job_description, company_name, position_name
-        )
+        cover_letter = ""
+        for cover_letter in self.cover_letter_generator.stream_cover_letter(
+            self.temp_candidate_profile, final_job_description, company_name, position_name, use_cache=use_cache
+        ):
+            yield cover_letter
         
         # Store cover letter temporarily instead of saving it right away
         self.temp_cover_letter = cover_letter
         
         progress(1.0, desc="Done!")
         gr.Info("✅ Cover letter generated successfully!")
-        return cover_letter  # Return None for file_output to avoid auto-saving
     
     def generate_qna_answer(self, application_question, word_limit, company_name, position_name):
         """Generate an answer for a job application question"""
         if not self.temp_resume_content or not self.temp_job_description:
-            return "Please generate a cover letter first to load your resume and job details."
+            yield "Please generate a cover letter first to load your resume and job details."
+            return
         
         if not application_question or application_question.strip() == "":
-            return "Please enter a question to generate an answer."
+            yield "Please enter a question to generate an answer."
+            return
         
         # Convert word limit to integer if provided
         word_limit_int = None
@@ -195,22 +240,24 @@ class Applicator:
             try:
                 word_limit_int = int(word_limit.strip())
             except ValueError:
-                return "Word limit must be a number."
+                yield "Word limit must be a number."
+                return
         
         # Generate the answer
-        answer = self.qna_generator.generate_answer(
-            self.temp_resume_content,
+        answer = ""
+        for answer in self.qna_generator.stream_answer(
+            self._candidate_profile(),
             self.temp_job_description,
             application_question,
             company_name,
             position_name,
-            word_limit_int
-        )
+            word_limit_int,
+            context=self._get_application_context()
+        ):
+            yield answer
         
         # Store this Q&A pair
         self.questions_answers.append((application_question, answer))
-        
-        return answer
     
     def clear_qna_history(self):
         """Clear the stored Q&A history"""
@@ -259,6 +306,11 @@ class Applicator:
             value=None
         )
 
+    def refresh_metrics(self):
+        """Return the current metrics as table rows and as Prometheus text"""
+        metrics = get_metrics()
+        return metrics.summary_rows(), metrics.prometheus_text()
+
     def refresh_resume_templates(self):
         """Refresh the list of available resume templates"""
         return gr.update(
@@ -289,13 +341,13 @@ class Applicator:
                     section, company_name, position_name, job_url, autofill_btn, job_description, generate_btn, reset_btn = create_job_details_section()
 
                 with gr.Column(scale=5):
-                    (tabs, cover_letter_output, download_btn, download_output,
+                    (tabs, cover_letter_output, regenerate_btn, download_btn, download_output,
                      resume_template, refresh_templates_btn, template_file, resume_sections,
                      user_suggestion, build_resume_btn, resume_latex_preview,
                      pdf_preview, ai_suggestions, fix_latex_pdf_btn, recompile_pdf_btn,
                      download_resume_btn, download_resume_output,
                      application_question, word_limit, answer_btn, answer_output,
-                     batch_questions, batch_word_limit, batch_generate_btn, batch_output,
+                     batch_questions, batch_word_limit, batch_single_call, batch_generate_btn, batch_output,
                      batch_download_btn, batch_download_output,
                      clear_qa_btn, download_qa_btn, download_qa_output,
                      qna_history_output,
@@ -306,7 +358,8 @@ class Applicator:
                      referral_name, referral_btn, referral_output,
                      download_referral_btn, download_referral_output, 
                      mail_description, context_source, generate_ai_mail_btn,
-                     ai_mail_output, download_ai_mail_btn, download_ai_mail_output ) = create_features_section(self.resume_builder)
+                     ai_mail_output, download_ai_mail_btn, download_ai_mail_output,
+                     metrics_refresh_btn, metrics_table, metrics_text) = create_features_section(self.resume_builder)
 
                 with gr.Column(scale=3):
                     chat_section, chat_history, msg_input, send_btn, clear_btn, status_msg = create_chat_interface()
@@ -325,6 +378,7 @@ class Applicator:
                     'generate_btn': generate_btn,
                     'reset_btn': reset_btn,
                     'cover_letter_output': cover_letter_output,
+                    'regenerate_btn': regenerate_btn,
                     'download_btn': download_btn,
                     'download_output': download_output,
                     'application_question': application_question,
@@ -333,6 +387,7 @@ class Applicator:
                     'answer_output': answer_output,
                     'batch_questions': batch_questions,
                     'batch_word_limit': batch_word_limit,
+                    'batch_single_call': batch_single_call,
                     'batch_generate_btn': batch_generate_btn,
                     'batch_output': batch_output,
                     'batch_download_btn': batch_download_btn,
@@ -375,6 +430,9 @@ class Applicator:
                     'ai_mail_output': ai_mail_output,
                     'download_ai_mail_btn': download_ai_mail_btn,
                     'download_ai_mail_output': download_ai_mail_output,
+                    'metrics_refresh_btn': metrics_refresh_btn,
+                    'metrics_table': metrics_table,
+                    'metrics_text': metrics_text,
                     'chat_section': chat_section,
                     'chat_history': chat_history,
                     'msg_input': msg_input,
@@ -406,33 +464,39 @@ class Applicator:
     def generate_cold_mail(self, hr_name, company_name, position_name):
         """Generate a cold mail to a hiring manager"""
         if not self.temp_resume_content or not self.temp_job_description:
-            return "Please generate a cover letter first to load your resume and job details."
+            yield "Please generate a cover letter first to load your resume and job details."
+            return
         
         if not company_name or not position_name:
-            return "Please provide both company name and position title."
+            yield "Please provide both company name and position title."
+            return
         
-        return self.cold_mail_generator.generate_cold_mail(
-            self.temp_resume_content,
+        yield from self.cold_mail_generator.stream_cold_mail(
+            self._candidate_profile(),
             self.temp_job_description,
             hr_name,
             company_name,
-            position_name
+            position_name,
+            context=self._get_application_context()
         )
     
     def generate_linkedin_dm(self, hr_name, company_name, position_name):
         """Generate a LinkedIn DM to a hiring manager"""
         if not self.temp_resume_content or not self.temp_job_description:
-            return "Please generate a cover letter first to load your resume and job details."
+            yield "Please generate a cover letter first to load your resume and job details."
+            return
         
         if not company_name or not position_name:
-            return "Please provide both company name and position title."
+            yield "Please provide both company name and position title."
+            return
         
-        return self.linkedin_dm_generator.generate_linkedin_dm(
-            self.temp_resume_content,
+        yield from self.linkedin_dm_generator.stream_linkedin_dm(
+            self._candidate_profile(),
             self.temp_job_description,
             hr_name,
             company_name,
-            position_name
+            position_name,
+            context=self._get_application_context()
         )
     
     def download_cold_mail(self, company_name, position_name):
@@ -454,20 +518,24 @@ class Applicator:
     def generate_referral_dm(self, referral_name, company_name, position_name):
         """Generate a LinkedIn DM to request a referral"""
         if not self.temp_resume_content or not self.temp_job_description:
-            return "Please generate a cover letter first to load your resume and job details."
+            yield "Please generate a cover letter first to load your resume and job details."
+            return
         
         if not company_name or not position_name:
-            return "Please provide both company name and position title."
+            yield "Please provide both company name and position title."
+            return
             
         if not referral_name:
-            return "Please provide the name of your connection to personalize the message."
+            yield "Please provide the name of your connection to personalize the message."
+            return
         
-        return self.referral_dm_generator.generate_referral_dm(
-            self.temp_resume_content,
+        yield from self.referral_dm_generator.stream_referral_dm(
+            self._candidate_profile(),
             self.temp_job_description,
             referral_name,
             company_name,
-            position_name
+            position_name,
+            context=self._get_application_context()
         )
     
     def download_referral_dm(self, company_name, position_name):
@@ -478,19 +546,25 @@ class Applicator:
         
         return self.referral_dm_generator.save_referral_dm(referral_dm, company_name, position_name)
 
-    def generate_batch_answers(self, batch_questions, word_limit, company_name, position_name):
-        """Generate answers for multiple questions at once"""
+    def generate_batch_answers(self, batch_questions, word_limit, company_name, position_name, single_call=False):
+        """Generate answers for multiple questions at once, showing each answer as soon as it is ready.
+        
+        With single_call, all questions are answered by one request instead of one request each.
+        """
         if not self.temp_resume_content or not self.temp_job_description:
-            return "Please generate a cover letter first to load your resume and job details."
+            yield "Please generate a cover letter first to load your resume and job details."
+            return
         
         if not batch_questions or batch_questions.strip() == "":
-            return "Please enter at least one question to generate answers."
+            yield "Please enter at least one question to generate answers."
+            return
         
         # Parse the questions (one per line)
         questions = [q.strip() for q in batch_questions.split('\n') if q.strip()]
         
         if not questions:
-            return "Please enter at least one valid question."
+            yield "Please enter at least one valid question."
+            return
         
         # Convert word limit to integer if provided
         word_limit_int = None
@@ -498,27 +572,37 @@ class Applicator:
             try:
                 word_limit_int = int(word_limit.strip())
             except ValueError:
-                return "Word limit must be a number."
-        
-        # Generate answers for all questions
+                yield "Word limit must be a number."
+                return
+        
+        # Generate the answers concurrently or in one request; results are shown in question order
+        answers = [None] * len(questions)
+        yield self._format_batch_answers(questions, answers)
+        if single_call:
+            generate_answers = self.qna_generator.generate_answers_in_one_call
+        else:
+            generate_answers = self.qna_generator.generate_answers
+        for index, answer in generate_answers(
+            self._candidate_profile(),
+            self.temp_job_description,
+            questions,
+            company_name,
+            position_name,
+            word_limit_int,
+            context=self._get_application_context()
+        ):
+            answers[index] = answer
+            yield self._format_batch_answers(questions, answers)
+        
+        # Add to Q&A history
+        self.questions_answers.extend(zip(questions, answers))
+
+    @staticmethod
+    def _format_batch_answers(questions, answers):
+        """Format the batch for display, marking questions still being answered"""
         results = []
-        for question in questions:
-            answer = self.qna_generator.generate_answer(
-                self.temp_resume_content,
-                self.temp_job_description,
-                question,
-                company_name,
-                position_name,
-                word_limit_int
-            )
-            
-            # Add to Q&A history
-            self.questions_answers.append((question, answer))
-            
-            # Format for display
-            results.append(f"Q: {question}\n\nA: {answer}\n\n---\n")
-        
-        # Combine all results
+        for question, answer in zip(questions, answers):
+            results.append(f"Q: {question}\n\nA: {answer if answer is not None else 'Generating...'}\n\n---\n")
         return "\n".join(results)
 
     def download_batch_file(self, company_name, position_name):
@@ -530,18 +614,23 @@ class Applicator:
         """Build an optimized resume based on the selected template and job description"""
         if not self.temp_resume_content or not self.temp_job_description:
             gr.Warning("Please generate a cover letter first to load your resume and job details.")
-            return "Please generate a cover letter first to load your resume and job details.", None
+            yield "Please generate a cover letter first to load your resume and job details.", None
+            return
         
         if not template_name:
             gr.Warning("Please select a resume template.")
-            return "Please select a resume template.", None
+            yield "Please select a resume template.", None
+            return
         
         if not company_name or not position_name:
             gr.Warning("Please provide both company name and position title.")
-            return "Please provide both company name and position title.", None
+            yield "Please provide both company name and position title.", None
+            return
         
-        # Generate optimized resume content
-        resume_content = self.resume_builder.generate_resume_content(
+        # Generate optimized resume content. Rewriting the resume needs every detail of it, so this
+        # sends the full extracted text rather than the compact profile the shared context holds
+        resume_content = ""
+        for resume_content in self.resume_builder.stream_resume_content(
             self.temp_resume_content,
             self.temp_job_description,
             sections,
@@ -549,12 +638,14 @@ class Applicator:
             company_name,
             position_name,
             template_name
-        )
+        ):
+            yield resume_content, None
         
         # Check if the resume_content is a string (error message)
         if isinstance(resume_content, str) and (resume_content.startswith("Error") or resume_content.startswith("Please")):
             gr.Warning(resume_content)
-            return resume_content, None
+            yield resume_content, None
+            return
         
         pdf_path, error = self.resume_builder.generate_resume_pdf(
             resume_content,
@@ -577,13 +668,13 @@ class Applicator:
 
             if error or pdf_path is None:
                 gr.Warning("Failed to compile LaTeX after attempting fixes")
-                return resume_content, None
+                yield resume_content, None
             else:
                 gr.Info("✅ LaTeX compilation successful!")
-                return resume_content, pdf_path
+                yield resume_content, pdf_path
         else:
             gr.Info("✅ LaTeX compilation successful!")
-            return resume_content, pdf_path
+            yield resume_content, pdf_path
         
 
     def download_resume(self, company_name, position_name, resume_content, template_name):
@@ -696,7 +787,11 @@ class Applicator:
         # Clear temporary data
         self.temp_cover_letter = None
         self.temp_resume_content = None
+        self.temp_candidate_profile = None
         self.temp_job_description = None
+        if self.application_context is not None:
+            self.application_context.close()
+            self.application_context = None
         self.questions_answers = []
         
         # Return empty values for all form fields
@@ -734,6 +829,12 @@ class Applicator:
             if crawled_content.startswith("Error"):
                 return "", ""
             
+            # Structured data found on the page (JSON-LD, known ATS layouts) makes the LLM call unnecessary
+            structured = self.web_crawler.get_job_details(input_text)
+            if structured and structured.get('company') and structured.get('position'):
+                progress(1.0, desc="Done!")
+                return structured['company'], structured['position']
+            
             progress(0.6, desc="Cleaning job description...")
             # Clean the job description
             cleaned_content = self.web_crawler.clean_job_description(crawled_content)
@@ -751,7 +852,8 @@ class Applicator:
     def generate_ai_mail(self, description, context_source, resume_file, resume_dropdown, company_name, position_name):
         """Generate an AI email based on the provided description and context"""
         if not description:
-            return "Please provide a description of what you want to communicate."
+            yield "Please provide a description of what you want to communicate."
+            return
 
         # Get resume content if needed
         resume_content = None
@@ -763,7 +865,8 @@ class Applicator:
                 resume_content = self.resume_processor.extract_text(resume_dropdown)
 
             if not resume_content and context_source == "Resume":
-                return "Please provide a resume to use as context."
+                yield "Please provide a resume to use as context."
+                return
             elif not resume_content and context_source == "Both":
                 # If "Both" is selected but resume is missing, notify user but continue with job description
                 gr.Warning("⚠️ Resume not provided. Using only job description for context.")
@@ -774,7 +877,8 @@ class Applicator:
             job_description = self.temp_job_description
             if not job_description and context_source == "Job Description":
                 gr.Warning("⚠️ Job description not provided. Please generate a cover letter first.")
-                return "Please provide a job description to use as context."
+                yield "Please provide a job description to use as context."
+                return
             elif not job_description and context_source == "Both":
                 # If "Both" is selected but job description is missing, use only resume
                 gr.Warning("⚠️ Job description not provided. Using only resume for context.")
@@ -787,29 +891,43 @@ class Applicator:
             position_name = None
 
         # Prepare context based on selection, using only verified user information
+        if context_source != "None":
+            resume_excerpt, job_excerpt = fit_resume_and_job(
+                resume_content if context_source in ["Resume", "Both"] else "",
+                job_description if context_source in ["Job Description", "Both"] else ""
+            )
         context = ""
         if context_source == "None":
             context = "Generate a professional email based only on the provided instructions."
         elif context_source == "Resume":
             # Only use verified information from the user's resume
-            context = f"Using only the following verified information from your resume:\n{resume_content}"
+            context = f"Using only the following verified information from your resume:\n{resume_excerpt}"
         elif context_source == "Job Description":
-            context = f"Job Description:\n{job_description}"
+            context = f"Job Description:\n{job_excerpt}"
         else:  # Both
             # Combine resume and job description while emphasizing use of verified information
-            context = f"Using only the following verified information from your resume:\n{resume_content}\n\nJob Description:\n{job_description}"
+            context = f"Using only the following verified information from your resume:\n{resume_excerpt}\n\nJob Description:\n{job_excerpt}"
+
+        # The session context already holds this exact resume and job description; don't resend them
+        application_context = None
+        if context_source == "Both" and resume_content == self.temp_resume_content:
+            application_context = self._get_application_context()
+            if application_context is not None:
+                context = "Using only verified information from the resume, together with the job description, provided above."
 
         # Generate the email
-        email_content = self.ai_mail_generator.generate_email(
+        email_content = ""
+        for email_content in self.ai_mail_generator.stream_email(
             description=description,
             context=context,
             company_name=company_name,
-            position_name=position_name
-        )
+            position_name=position_name,
+            application_context=application_context
+        ):
+            yield email_content
 
         # Store for later use
         self.ai_mail_generator.temp_email = email_content
-        return email_content
 
     def download_ai_mail(self, company_name, position_name, email_content):
         """Save and download the AI-generated email"""
@@ -833,50 +951,56 @@ class Applicator:
             return None
 
     def submit_chat_message(self, message, chat_history):
-        """Handle chat message submission and generate response"""
+        """Handle chat message submission and stream the response into the chat"""
         if not message or message.strip() == "":
-            return "Please enter a message.", chat_history
-        
-        # Generate response using the chatbot generator
-        response = self.chatbot_generator.generate_response(
-            user_message=message,
-            job_description=self.temp_job_description,
-            resume_content=self.temp_resume_content,
-            company_name=self.company_name,
-            position_name=self.position_name
-        )
+            yield "Please enter a message.", chat_history
+            return
         
         # Update chat history
         if chat_history is None:
             chat_history = []
         
         # Add the user's message to history
-        chat_history.append({"role": "user", "content": message})
+        chat_history = chat_history + [{"role": "user", "content": message}]
         
+        # Generate the response using the chatbot generator, showing it as it arrives
+        for response in self.chatbot_generator.stream_response(
+            user_message=message,
+            job_description=self.temp_job_description,
+            resume_content=self._candidate_profile(),
+            company_name=self.company_name,
+            position_name=self.position_name,
+            context=self._get_application_context()
+        ):
+            # Return empty string for message input to clear it
+            yield "", chat_history + self._chat_messages(response)
+    
+    @staticmethod
+    def _chat_messages(response):
+        """Turn a chatbot response into the assistant messages shown in the chat"""
         # Handle both string and dictionary responses
         if isinstance(response, str):
-            chat_history.append({
+            return [{
                 "role": "assistant",
                 "content": response,
                 "output": "main"
-            })
-        else:
-            # Add the main content as a separate message
-            chat_history.append({
+            }]
+        
+        # Add the main content as a separate message
+        messages = [{
+            "role": "assistant",
+            "content": response.get("main_content", "I apologize, but I couldn't generate a response. Please try again."),
+            "output": "main"
+        }]
+        
+        # Add additional notes as a separate message if they exist
+        if response.get("additional_notes"):
+            messages.append({
                 "role": "assistant",
-                "content": response.get("main_content", "I apologize, but I couldn't generate a response. Please try again."),
-                "output": "main"
+                "content": response.get("additional_notes"),
+                "output": "notes"
             })
-            
-            # Add additional notes as a separate message if they exist
-            if response.get("additional_notes"):
-                chat_history.append({
-                    "role": "assistant",
-                    "content": response.get("additional_notes"),
-                    "output": "notes"
-                })
-        
-        return "", chat_history  # Return empty string for message input to clear it
+        return messages
 
     def clear_chat_history(self):
         """Clear the chat history"""
@@ -14,7 +14,6 @@ if not API_KEY:
 genai.configure(api_key=API_KEY)
 
 # Constants
-MAX_TOKEN_LENGTH = 8000
 CACHE_EXPIRY = 120  # 2 minutes in seconds
 VERSION = "1.0.3"
 
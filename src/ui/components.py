@@ -126,7 +126,9 @@ def create_features_section(resume_builder):
                     info="Your customized cover letter will appear here. Feel free to edit before downloading.",
                     interactive=True  # Make the textbox editable
                 )
-                download_btn = gr.Button("Download PDF", variant="secondary")
+                with gr.Row():
+                    regenerate_btn = gr.Button("Regenerate", variant="secondary")
+                    download_btn = gr.Button("Download PDF", variant="secondary")
                 download_output = gr.File()
 
         with gr.TabItem("Application Q&A"):
@@ -162,6 +164,11 @@ def create_features_section(resume_builder):
                         label="Word Limit (Optional)",
                         placeholder="Enter word limit if specified..."
                     )
+                    batch_single_call = gr.Checkbox(
+                        label="Answer all questions in one request",
+                        value=False,
+                        info="Sends your resume and the job description once for the whole batch. Cheaper and usually faster for many questions."
+                    )
                     # Removed redundant company and position fields
                     
                     batch_generate_btn = gr.Button("Generate All Answers", variant="primary")
@@ -369,17 +376,37 @@ def create_features_section(resume_builder):
                         download_resume_btn = gr.Button("Download Resume PDF", variant="primary")
                         download_resume_output = gr.File(label="Download Resume")
 
-
+        with gr.TabItem("Metrics"):
+            with gr.Group():
+                gr.Markdown("## Model Calls and Caches")
+                gr.Markdown("Latency, tokens and cache hits per generator since the app started. "
+                            "The same figures are written to src/data/metrics every minute.")
+                
+                metrics_refresh_btn = gr.Button("Refresh Metrics", variant="secondary", size="sm")
+                metrics_table = gr.Dataframe(
+                    headers=["Generator", "Operation", "Calls", "Errors", "Retries",
+                             "Wall p50 (s)", "Wall p95 (s)", "TTFT p50 (s)", "TTFT p95 (s)",
+                             "Prompt Tokens", "Output Tokens", "Cached Tokens",
+                             "Cache Hits", "Cache Misses", "Hit Rate"],
+                    interactive=False,
+                    wrap=True
+                )
+                metrics_text = gr.Textbox(
+                    label="Prometheus Format",
+                    lines=10,
+                    show_copy_button=True,
+                    interactive=False
+                )
 
     return (
-        tabs, cover_letter_output, download_btn, download_output,
+        tabs, cover_letter_output, regenerate_btn, download_btn, download_output,
         resume_template, refresh_templates_btn, template_file, resume_sections,  # Added template_file
         user_suggestion, build_resume_btn, resume_latex_preview,
         pdf_preview, ai_suggestions, fix_latex_pdf_btn, recompile_pdf_btn,
         download_resume_btn, download_resume_output,
         # Add Q&A components
         application_question, word_limit, answer_btn, answer_output,
-        batch_questions, batch_word_limit, batch_generate_btn, batch_output,
+        batch_questions, batch_word_limit, batch_single_call, batch_generate_btn, batch_output,
         batch_download_btn, batch_download_output,
         clear_qa_btn, download_qa_btn, download_qa_output,
         qna_history_output,
@@ -391,7 +418,9 @@ def create_features_section(resume_builder):
         referral_name, referral_btn, referral_output,
         download_referral_btn, download_referral_output,
         mail_description, context_source, generate_ai_mail_btn,
-        ai_mail_output, download_ai_mail_btn, download_ai_mail_output
+        ai_mail_output, download_ai_mail_btn, download_ai_mail_output,
+        # Add metrics components
+        metrics_refresh_btn, metrics_table, metrics_text
     )
 
 
@@ -13,6 +13,7 @@ def setup_event_handlers(app, ui_elements):
     company_name = ui_elements['company_name']
     position_name = ui_elements['position_name']
     cover_letter_output = ui_elements['cover_letter_output']
+    regenerate_btn = ui_elements['regenerate_btn']
     download_output = ui_elements['download_output']
     
     # Extract Q&A elements
@@ -22,6 +23,7 @@ def setup_event_handlers(app, ui_elements):
     answer_output = ui_elements['answer_output']
     batch_questions = ui_elements['batch_questions']
     batch_word_limit = ui_elements['batch_word_limit']
+    batch_single_call = ui_elements['batch_single_call']
     batch_generate_btn = ui_elements['batch_generate_btn']
     batch_output = ui_elements['batch_output']
     batch_download_btn = ui_elements['batch_download_btn']
@@ -55,6 +57,9 @@ def setup_event_handlers(app, ui_elements):
     ai_mail_output = ui_elements['ai_mail_output']
     download_ai_mail_btn = ui_elements['download_ai_mail_btn']
     download_ai_mail_output = ui_elements['download_ai_mail_output']
+    metrics_refresh_btn = ui_elements['metrics_refresh_btn']
+    metrics_table = ui_elements['metrics_table']
+    metrics_text = ui_elements['metrics_text']
 
     # Extract resume builder elements
     resume_template = ui_elements['resume_template']
@@ -78,6 +83,14 @@ def setup_event_handlers(app, ui_elements):
     chat_clear_btn = ui_elements['clear_btn']
     chat_status = ui_elements['status_msg']
     
+    # Crawl the job URL speculatively while the user fills in the rest of the form
+    job_url.change(
+        fn=app.prefetch_job_url,
+        inputs=[job_url],
+        outputs=None,
+        show_progress="hidden"
+    )
+
     # Connect the autofill button
     autofill_btn.click(
         fn=app._autofill_job_details,
@@ -99,6 +112,20 @@ def setup_event_handlers(app, ui_elements):
         outputs=[cover_letter_output]
     )
     
+    # Same inputs as generate, but always asks the model for a fresh letter
+    regenerate_btn.click(
+        fn=app.regenerate_workflow,
+        inputs=[
+            resume_file,
+            resume_dropdown,
+            job_description,
+            job_url,
+            company_name,
+            position_name
+        ],
+        outputs=[cover_letter_output]
+    )
+    
     # Update event handlers to pass current content
     download_btn.click(
         fn=app.download_file,
@@ -154,7 +181,7 @@ def setup_event_handlers(app, ui_elements):
     # Batch Q&A tab functionality
     batch_generate_btn.click(
         fn=app.generate_batch_answers,
-        inputs=[batch_questions, batch_word_limit, company_name, position_name],
+        inputs=[batch_questions, batch_word_limit, company_name, position_name, batch_single_call],
         outputs=batch_output
     )
     
@@ -270,6 +297,12 @@ def setup_event_handlers(app, ui_elements):
         inputs=[company_name, position_name, ai_mail_output],
         outputs=download_ai_mail_output
     )
+
+    metrics_refresh_btn.click(
+        fn=app.refresh_metrics,
+        inputs=[],
+        outputs=[metrics_table, metrics_text]
+    )
     # Add Chat Interface event handlers
     chat_submit_btn.click(
         fn=app.submit_chat_message,
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+
+NGRAM_SIZES = (3, 4, 5)  # Character n-grams, taken within words
+MAX_ENTRIES = 2000  # Oldest answers are dropped beyond this
+ENTRY_TTL = 7 * 24 * 3600  # Seconds an answer stays reusable
+
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+# Words that don't change what a question asks. Negations ("not", "never", "no") are deliberately
+# absent: they reverse the question.
+STOP_WORDS = frozenset(
+    "a an the and or of to in on at for with about as by from into this that these those is are was were be been "
+    "being do does did have has had you your yours i me my we our us it its can could would should will shall may "
+    "might please briefly".split()
+)
+
+
+class SimilarAnswer(NamedTuple):
+    """A stored answer to a question similar to the one asked"""
+    question: str
+    answer: str
+    word_limit: Optional[int]
+    similarity: float
+
+
+def normalize_question(question: str) -> str:
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', question.lower())).strip()
+
+
+def content_words(question: str) -> List[str]:
+    """The words of a question that carry its meaning, in order"""
+    return [word for word in normalize_question(question).split() if word not in STOP_WORDS]
+
+
+def char_ngrams(text: str) -> List[str]:
+    """Character n-grams of each word, padded with spaces so word starts and ends count"""
+    grams = []
+    for word in text.split():
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            grams.extend(padded[i:i + size] for i in range(max(1, len(padded) - size + 1)))
+    return grams
+
+
+class AnswerIndex:
+    """Local similarity index over answered application questions, persisted as JSON.
+
+    Answers are grouped by scope (one scope per resume, job description, company and position),
+    and only compared within their scope. Similarity is the cosine between TF-IDF weighted
+    character n-gram vectors, computed with NumPy; nothing leaves the machine.
+    """
+
+    def __init__(self, path: Path, max_entries: int = MAX_ENTRIES, ttl: float = ENTRY_TTL):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: List[Dict] = self._load()
+        self._matrices: Dict[str, tuple] = {}  # scope -> (entries, vocabulary, idf, normalized matrix)
+
+    def _load(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            cutoff = time.time() - self.ttl
+            return [entry for entry in entries if entry.get('timestamp', 0) >= cutoff]
+        except Exception as e:
+            print(f"Error loading answer index: {str(e)}")
+            return []
+
+    def _save(self) -> None:
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving answer index: {str(e)}")
+
+    def add(self, scope: str, question: str, answer: str, word_limit: Optional[int] = None) -> None:
+        """Record an answer, replacing any earlier answer to the same question in the scope"""
+        normalized = normalize_question(question)
+        with self._lock:
+            self._entries = [
+                entry for entry in self._entries
+                if not (entry['scope'] == scope and entry['normalized'] == normalized
+                        and entry.get('word_limit') == word_limit)
+            ]
+            self._entries.append({
+                'scope': scope,
+                'question': question,
+                'normalized': normalized,
+                'answer': answer,
+                'word_limit': word_limit,
+                'timestamp': time.time(),
+            })
+            del self._entries[:-self.max_entries]
+            self._matrices.pop(scope, None)
+            self._save()
+
+    def find(self, scope: str, question: str) -> Optional[SimilarAnswer]:
+        """Return the most similar answered question in the scope, if there is one"""
+        with self._lock:
+            cached = self._matrices.get(scope)
+            if cached is None:
+                cached = self._matrices[scope] = self._build_matrix(scope)
+        entries, vocabulary, idf, matrix = cached
+        if not entries:
+            return None
+
+        query = np.zeros(len(vocabulary))
+        unseen: Dict[str, int] = {}
+        for gram in char_ngrams(normalize_question(question)):
+            column = vocabulary.get(gram)
+            if column is not None:
+                query[column] += 1
+            else:
+                unseen[gram] = unseen.get(gram, 0) + 1
+        query *= idf
+        # N-grams no stored question has still count towards the query's length, with the highest IDF
+        unseen_idf = np.log(1 + len(entries)) + 1
+        norm = np.sqrt(query @ query + sum((count * unseen_idf) ** 2 for count in unseen.values()))
+        if not norm:
+            return None
+
+        similarities = matrix @ (query / norm)
+        best = int(np.argmax(similarities))
+        entry = entries[best]
+        return SimilarAnswer(entry['question'], entry['answer'], entry.get('word_limit'), float(similarities[best]))
+
+    def _build_matrix(self, scope: str) -> tuple:
+        """Vectorize the scope's questions: TF-IDF over character n-grams, rows normalized to unit length"""
+        cutoff = time.time() - self.ttl
+        entries = [entry for entry in self._entries if entry['scope'] == scope and entry['timestamp'] >= cutoff]
+        documents = [char_ngrams(entry['normalized']) for entry in entries]
+
+        vocabulary: Dict[str, int] = {}
+        for grams in documents:
+            for gram in grams:
+                vocabulary.setdefault(gram, len(vocabulary))
+
+        counts = np.zeros((len(entries), len(vocabulary)))
+        for row, grams in enumerate(documents):
+            for gram in grams:
+                counts[row, vocabulary[gram]] += 1
+
+        # Smoothed IDF, as if the query were one more document containing every n-gram
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(entries)) / (1 + document_frequency)) + 1
+
+        matrix = counts * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return entries, vocabulary, idf, matrix / norms
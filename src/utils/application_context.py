@@ -0,0 +1,209 @@
+import datetime
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from google.api_core import exceptions as google_exceptions
+from google.generativeai import caching
+
+from .llm_client import LLMClient, get_llm_client
+from .prompt_budget import MAX_PROMPT_TOKENS, estimate_tokens, fit_resume_and_job
+
+
+# Explicit caching needs a pinned model version and a minimum prefix size. A candidate profile
+# plus a job description is usually well under the minimum, so most sessions send the prefix inline.
+CACHED_CONTENT_MODEL = 'models/gemini-2.0-flash-001'
+MIN_CACHED_TOKENS = 4096
+CACHED_CONTENT_TTL = datetime.timedelta(hours=1)
+CACHE_REFRESH_MARGIN = 60  # Seconds before expiry at which the cached content is recreated
+
+CONTEXT_INSTRUCTION = (
+    "You are assisting a job candidate with one specific application. The candidate's resume "
+    "and the job description are provided below; every later request refers to them."
+)
+
+
+def build_context_prefix(resume_content: str, job_description: str) -> str:
+    """The shared prompt prefix: the resume and job description every follow-up task uses"""
+    resume_content, job_description = fit_resume_and_job(resume_content, job_description, MAX_PROMPT_TOKENS)
+    return f"{CONTEXT_INSTRUCTION}\n\nResume:\n{resume_content}\n\nJob Description:\n{job_description}\n"
+
+
+class InlinePrefixBackend:
+    """Sends the prefix with every request. Always available.
+
+    Every request is billed for the full prefix: gemini-2.0-flash has no implicit prefix
+    caching, so this saves nothing over a task prompt carrying the same text itself.
+    """
+
+    name = 'inline'
+    uploads_prefix = False
+
+    def __init__(self, prefix: str, llm: LLMClient):
+        self.prefix = prefix
+        self.llm = llm
+
+    def generate(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
+        return self.llm.generate(self.prefix + "\n" + task_prompt, generation_config, **kwargs)
+
+    def stream_text(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                    **kwargs: Any) -> Iterator[str]:
+        return self.llm.stream_text(self.prefix + "\n" + task_prompt, generation_config, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+
+class GeminiCachedContentBackend:
+    """Uploads the prefix once as Gemini cached content; requests then send only the task.
+
+    The cache is created on first use, and recreated when it is about to expire or the API no
+    longer finds it. If creating it fails (unsupported model, prefix too small, quota), the
+    backend falls back to sending the prefix inline for the rest of the session.
+    """
+
+    name = 'gemini-cached-content'
+
+    @property
+    def uploads_prefix(self) -> bool:
+        # Checked before the first request, so it is optimistic until creating the cache has been tried
+        return self._fallback is None
+
+    def __init__(self, prefix: str, llm: LLMClient, model_name: str = CACHED_CONTENT_MODEL,
+                 ttl: datetime.timedelta = CACHED_CONTENT_TTL):
+        self.prefix = prefix
+        self.llm = llm
+        self.model_name = model_name
+        self.ttl = ttl
+        self._cached_content = None
+        self._expires_at = 0.0
+        self._fallback: Optional[InlinePrefixBackend] = None
+        self._lock = threading.Lock()
+
+    def _ensure_cache(self) -> Any:
+        """Return the live cached content, creating or recreating it as needed (None once fallen back)"""
+        with self._lock:
+            if self._fallback is not None:
+                return None
+            if self._cached_content is not None and time.time() < self._expires_at - CACHE_REFRESH_MARGIN:
+                return self._cached_content
+            expired, self._cached_content = self._cached_content, None
+            try:
+                self._cached_content = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name='application-context',
+                    contents=[self.prefix],
+                    ttl=self.ttl,
+                )
+                self._expires_at = time.time() + self.ttl.total_seconds()
+            except Exception as e:
+                print(f"Context caching unavailable, sending the prefix inline: {str(e)}")
+                self._fallback = InlinePrefixBackend(self.prefix, self.llm)
+            cached_content = self._cached_content
+        if expired is not None:
+            self._discard(expired)
+        return cached_content
+
+    def _invalidate(self, cached_content: Any) -> None:
+        """Forget cached content the API no longer has, so the next request recreates it"""
+        with self._lock:
+            if self._cached_content is cached_content:
+                self._cached_content = None
+        self._discard(cached_content)
+
+    def generate(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
+        for attempt in range(2):
+            cached_content = self._ensure_cache()
+            if cached_content is None:
+                return self._fallback.generate(task_prompt, generation_config, **kwargs)
+            try:
+                return self.llm.generate(task_prompt, generation_config, cached_content=cached_content, **kwargs)
+            except google_exceptions.NotFound:
+                # Expired or deleted on the server before its recorded expiry
+                if attempt:
+                    raise
+                self._invalidate(cached_content)
+
+    def stream_text(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                    **kwargs: Any) -> Iterator[str]:
+        for attempt in range(2):
+            cached_content = self._ensure_cache()
+            if cached_content is None:
+                yield from self._fallback.stream_text(task_prompt, generation_config, **kwargs)
+                return
+            started = False
+            try:
+                for chunk in self.llm.stream_text(task_prompt, generation_config, cached_content=cached_content,
+                                                  **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except google_exceptions.NotFound:
+                if attempt or started:
+                    raise
+                self._invalidate(cached_content)
+
+    def _discard(self, cached_content: Any) -> None:
+        self.llm.forget_cached_content(cached_content)
+        try:
+            cached_content.delete()
+        except google_exceptions.NotFound:
+            pass  # Already expired
+        except Exception as e:
+            print(f"Error deleting cached context: {str(e)}")
+
+    def close(self) -> None:
+        with self._lock:
+            cached_content, self._cached_content = self._cached_content, None
+        if cached_content is not None:
+            self._discard(cached_content)
+
+
+class ApplicationContext:
+    """Session-scoped resume + job description context shared by the follow-up generators.
+
+    Generators pass only their task-specific prompt to generate(); the backend decides how
+    the shared prefix reaches the model. Generators that would otherwise send less than the
+    prefix should check saves_tokens() first.
+    """
+
+    def __init__(self, resume_content: str, job_description: str, backend: Any = None,
+                 llm: Optional[LLMClient] = None):
+        self.resume_content = resume_content
+        self.job_description = job_description
+        self.prefix = build_context_prefix(resume_content, job_description)
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        self.backend = backend or self._default_backend(self.prefix, llm or get_llm_client())
+
+    @staticmethod
+    def _default_backend(prefix: str, llm: LLMClient) -> Any:
+        # Below the minimum, explicit caching is refused
+        if estimate_tokens(prefix) >= MIN_CACHED_TOKENS:
+            return GeminiCachedContentBackend(prefix, llm)
+        return InlinePrefixBackend(prefix, llm)
+
+    def saves_tokens(self, budget: int) -> bool:
+        """Whether using the context costs no more input than a task prompt with its own budget of this many tokens.
+
+        True when the prefix is uploaded once as cached content, or is no bigger than the budget anyway.
+        """
+        return getattr(self.backend, 'uploads_prefix', False) or self.prefix_tokens <= budget
+
+    def matches(self, resume_content: str, job_description: str) -> bool:
+        return self.resume_content == resume_content and self.job_description == job_description
+
+    def generate(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
+        """Generate a response for a task prompt that relies on the shared context"""
+        return self.backend.generate(task_prompt, generation_config, **kwargs)
+
+    def generate_text(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                      **kwargs: Any) -> str:
+        return self.generate(task_prompt, generation_config, **kwargs).text
+
+    def stream_text(self, task_prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                    **kwargs: Any) -> Iterator[str]:
+        """Like generate_text, yielding text chunks as they arrive"""
+        return self.backend.stream_text(task_prompt, generation_config, **kwargs)
+
+    def close(self) -> None:
+        self.backend.close()
@@ -0,0 +1,105 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+
+class _PooledBrowser:
+    """A started crawler plus the bookkeeping the pool needs to recycle it"""
+
+    def __init__(self, crawler: AsyncWebCrawler):
+        self.crawler = crawler
+        self.pages = 0
+
+
+class BrowserPool:
+    """Bounded pool of warm headless browsers shared by all crawls of a WebCrawler"""
+
+    def __init__(self, browser_config: BrowserConfig, max_size: int = 1, max_pages_per_browser: int = 50):
+        self.browser_config = browser_config
+        self.max_size = max_size
+        self.max_pages_per_browser = max_pages_per_browser
+        self._idle: List[_PooledBrowser] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _bind_loop(self) -> None:
+        """Reset the pool if it is being used from a different event loop, closing its idle browsers"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        old_loop, stale = self._loop, self._idle
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(self.max_size)
+        self._loop = loop
+        for browser in stale:
+            # Browsers are driven from the loop they were started on; if it is gone, close
+            # them from here as a best effort rather than leaving the processes running
+            if old_loop is not None and old_loop.is_running():
+                asyncio.run_coroutine_threadsafe(self._close_browser(browser), old_loop)
+            else:
+                await self._close_browser(browser)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[AsyncWebCrawler]:
+        """Borrow a warm crawler, starting one lazily if none is idle"""
+        await self._bind_loop()
+        async with self._semaphore:
+            browser = await self._acquire()
+            healthy = True
+            try:
+                yield browser.crawler
+            except Exception:
+                # A crash mid-crawl usually leaves the browser in a bad state
+                healthy = False
+                raise
+            finally:
+                browser.pages += 1
+                await self._release(browser, healthy)
+
+    async def _acquire(self) -> _PooledBrowser:
+        """Return a healthy idle browser or start a new one"""
+        while self._idle:
+            browser = self._idle.pop()
+            if self._is_healthy(browser.crawler):
+                return browser
+            print("Discarding unhealthy browser from pool")
+            await self._close_browser(browser)
+
+        crawler = AsyncWebCrawler(config=self.browser_config)
+        await crawler.start()
+        return _PooledBrowser(crawler)
+
+    async def _release(self, browser: _PooledBrowser, healthy: bool) -> None:
+        """Put a browser back in the pool, or close it if it should be recycled"""
+        if not healthy or browser.pages >= self.max_pages_per_browser or not self._is_healthy(browser.crawler):
+            await self._close_browser(browser)
+            return
+        self._idle.append(browser)
+
+    @staticmethod
+    def _is_healthy(crawler: AsyncWebCrawler) -> bool:
+        """Check that the crawler is started and its browser is still connected"""
+        if not getattr(crawler, "ready", True):
+            return False
+        strategy = getattr(crawler, "crawler_strategy", None)
+        manager = getattr(strategy, "browser_manager", None)
+        browser = getattr(manager, "browser", None)
+        if browser is not None and hasattr(browser, "is_connected"):
+            return browser.is_connected()
+        return True
+
+    @staticmethod
+    async def _close_browser(browser: _PooledBrowser) -> None:
+        """Close a browser, ignoring errors from one that already died"""
+        try:
+            await browser.crawler.close()
+        except Exception as e:
+            print(f"Error closing pooled browser: {str(e)}")
+
+    async def close(self) -> None:
+        """Close every idle browser in the pool"""
+        idle, self._idle = self._idle, []
+        for browser in idle:
+            await self._close_browser(browser)
@@ -0,0 +1,50 @@
+import re
+
+
+# Everything up to the end of the current paragraph (the next blank line or the end of
+# the text). Equivalent to a lazy `.*?(?=\n\n|\Z)` under DOTALL, but written as an
+# unrolled possessive loop so each character is examined once instead of re-testing the
+# lookahead at every position.
+_TO_PARAGRAPH_END = r'[^\n]*+(?:\n(?!\n)[^\n]*+)*+'
+
+# Footer blocks. Each pattern is paired with a lowercase literal that must be present
+# for it to match at all, so pages without a footer never pay for the scan.
+_FOOTER_PATTERNS = [
+    ('</footer>', re.compile(r'<footer.*?>.*?</footer>', re.IGNORECASE | re.DOTALL)),
+    ('<!-- end footer -->', re.compile(r'<!-- footer.*?-->.*?<!-- end footer -->', re.IGNORECASE | re.DOTALL)),
+    ('footer', re.compile(r'---+\s*footer\s*---+' + _TO_PARAGRAPH_END, re.IGNORECASE)),
+    ('## footer', re.compile(r'## footer.*?(?=\n##|\Z)', re.IGNORECASE | re.DOTALL)),
+]
+
+_NAV_PATTERN = ('</nav>', re.compile(r'<nav.*?>.*?</nav>', re.IGNORECASE | re.DOTALL))
+
+# Boilerplate paragraphs, removed from the phrase to the end of its paragraph. The
+# phrases are matched in a single pass; applying them one after another gives the same
+# result because each removal stops at the same paragraph boundary. The leading
+# lookahead on first letters lets the engine reject most positions before trying the
+# case-insensitive alternation.
+_BOILERPLATE_PATTERN = re.compile(
+    r'(?=(?i:[cptafs]))(?i:cookie policy|privacy policy|terms of (?:use|service)|copyright ©|'
+    r'all rights reserved|follow us on|share this job)' + _TO_PARAGRAPH_END
+)
+
+_SOCIAL_LINK_PATTERN = re.compile(r'(?=(?i:[ftliy]))(?i:facebook|twitter|linkedin|instagram|youtube)\.com')
+_EXCESS_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+
+
+def clean_crawled_content(content: str) -> str:
+    """Remove footers, navigation and boilerplate from crawled page content"""
+    lowered = content.lower()
+    for marker, pattern in _FOOTER_PATTERNS:
+        if marker in lowered:
+            content = pattern.sub('', content)
+            lowered = content.lower()
+
+    marker, pattern = _NAV_PATTERN
+    if marker in lowered:
+        content = pattern.sub('', content)
+
+    content = _BOILERPLATE_PATTERN.sub('', content)
+    content = _SOCIAL_LINK_PATTERN.sub('', content)
+    content = _EXCESS_NEWLINES_PATTERN.sub('\n\n', content)
+    return content.strip()
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .url_normalizer import canonicalize_url
+
+
+# Defaults for long-running instances
+DEFAULT_TTL = 3 * 24 * 60 * 60  # Job postings change or close; re-crawl after 3 days
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024  # 100 MB on disk
+DEFAULT_MEMORY_ENTRIES = 64
+DEFAULT_STALE_GRACE = 14 * 24 * 60 * 60  # Keep expired entries this long so they can be revalidated
+INDEX_FLUSH_INTERVAL = 30  # Seconds between index writes caused only by hit-count updates
+
+_LEGACY_CACHE_FILE = re.compile(r'^[0-9a-f]{32}\.md$')
+
+
+class CrawlCache:
+    """Two-tier cache for crawled pages: an in-process LRU in front of an indexed on-disk store"""
+
+    def __init__(self, cache_dir: Path, ttl: int = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES, stale_grace: int = DEFAULT_STALE_GRACE):
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "crawl_index.json"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.stale_grace = stale_grace
+
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._index_dirty = False
+        self._last_flush = 0.0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+        self.purge_expired()
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        """Return the cache key for a URL, shared by every link to the same posting"""
+        return hashlib.md5(canonicalize_url(url).encode()).hexdigest()
+
+    def _file_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.md"
+
+    def get(self, url: str) -> Optional[str]:
+        """Return cached content for a URL, or None if missing or expired"""
+        key = self.key_for(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+
+            age = time.time() - entry['fetched_at']
+            if age > self.ttl:
+                # Expired entries are kept for a while so they can be revalidated cheaply
+                if age > self.ttl + self.stale_grace:
+                    self._remove(key)
+                    self._save_index()
+                return None
+
+            entry['hits'] = entry.get('hits', 0) + 1
+            entry['last_access'] = time.time()
+            self._index_dirty = True
+
+            content = self._load_content(key)
+            self._maybe_flush()
+            return content
+
+    def get_stale(self, url: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (content, metadata) for a URL even if expired, for conditional revalidation"""
+        key = self.key_for(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            content = self._load_content(key)
+            if content is None:
+                return None
+            return content, dict(entry)
+
+    def get_metadata(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the index entry for a URL (even if expired), without reading content"""
+        with self._lock:
+            entry = self._index.get(self.key_for(url))
+            return dict(entry) if entry is not None else None
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+              details: Optional[Dict[str, str]] = None) -> None:
+        """Mark a cached entry as freshly validated without rewriting its content"""
+        key = self.key_for(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return
+            now = time.time()
+            entry['fetched_at'] = now
+            entry['last_access'] = now
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            if details:
+                entry['details'] = details
+            self._save_index()
+
+    def urls(self) -> List[str]:
+        """Return the URLs of all indexed entries"""
+        with self._lock:
+            return [entry['url'] for entry in self._index.values() if entry.get('url')]
+
+    def _load_content(self, key: str) -> Optional[str]:
+        """Return content from the memory tier or disk, dropping entries whose file is gone"""
+        content = self._memory.get(key)
+        if content is not None:
+            self._memory.move_to_end(key)
+            return content
+
+        content = self._read_file(key)
+        if content is None:
+            # The file was removed behind our back; forget the entry
+            self._remove(key)
+            self._save_index()
+            return None
+        self._remember(key, content)
+        return content
+
+    def put(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+            content_hash: Optional[str] = None, details: Optional[Dict[str, str]] = None) -> None:
+        """Store content for a URL, evicting least recently used entries over the size budget"""
+        key = self.key_for(url)
+        url = canonicalize_url(url)
+        data = f"<!-- Source URL: {url} -->\n\n{content}".encode('utf-8')
+        with self._lock:
+            try:
+                self._atomic_write(self._file_for(key), data)
+            except OSError as e:
+                print(f"Error saving to cache: {str(e)}")
+                return
+
+            now = time.time()
+            self._index[key] = {
+                'url': url,
+                'fetched_at': now,
+                'last_access': now,
+                'size': len(data),
+                'hits': 0,
+                'etag': etag,
+                'last_modified': last_modified,
+                'content_hash': content_hash,
+                'details': details,
+            }
+            self._remember(key, content)
+            self._evict()
+            self._save_index()
+        print(f"Saved content to cache: {self._file_for(key)}")
+
+    def purge_expired(self) -> int:
+        """Delete entries past their TTL and revalidation grace period, returning how many were removed"""
+        with self._lock:
+            now = time.time()
+            max_age = self.ttl + self.stale_grace
+            expired = [key for key, entry in self._index.items() if now - entry['fetched_at'] > max_age]
+            for key in expired:
+                self._remove(key)
+            if self._index_dirty:
+                self._save_index()
+        return len(expired)
+
+    def flush(self) -> None:
+        """Persist pending index updates (hit counts, access times)"""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    def _remember(self, key: str, content: str) -> None:
+        """Insert content into the in-memory LRU tier"""
+        self._memory[key] = content
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_file(self, key: str) -> Optional[str]:
+        """Read a cache file and strip the source URL header"""
+        try:
+            with open(self._file_for(key), 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            return None
+        if content.startswith("<!-- Source URL:"):
+            _, _, content = content.partition("-->\n\n")
+        return content
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry from both tiers and delete its file"""
+        self._index.pop(key, None)
+        self._memory.pop(key, None)
+        self._index_dirty = True
+        try:
+            self._file_for(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error removing cache file: {str(e)}")
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the disk budget is met"""
+        total = sum(entry['size'] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_access']):
+            total -= self._index[key]['size']
+            self._remove(key)
+            if total <= self.max_bytes:
+                break
+
+    def _maybe_flush(self) -> None:
+        if self._index_dirty and time.time() - self._last_flush > INDEX_FLUSH_INTERVAL:
+            self._save_index()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Load the index, adopting cache files written before the index existed"""
+        index: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error reading crawl cache index, rebuilding: {str(e)}")
+
+        # Older indexes also stored the full description with the details; it belongs in the content file
+        for entry in index.values():
+            if isinstance(entry.get('details'), dict):
+                entry['details'].pop('description', None)
+
+        for path in self.cache_dir.iterdir():
+            key = path.stem
+            if key in index or not _LEGACY_CACHE_FILE.match(path.name):
+                continue
+            stat = path.stat()
+            index[key] = {
+                'url': '',
+                'fetched_at': stat.st_mtime,
+                'last_access': stat.st_mtime,
+                'size': stat.st_size,
+                'hits': 0,
+            }
+            self._index_dirty = True
+        return index
+
+    def _save_index(self) -> None:
+        try:
+            self._atomic_write(self.index_path, json.dumps(self._index).encode('utf-8'))
+            self._index_dirty = False
+            self._last_flush = time.time()
+        except OSError as e:
+            print(f"Error saving crawl cache index: {str(e)}")
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        """Write to a temporary file and rename it into place"""
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
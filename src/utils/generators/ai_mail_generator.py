@@ -1,8 +1,8 @@
 import os
 import re
 import time
-import google.generativeai as genai
 from pathlib import Path
+from ..llm_client import collect_stream, get_llm_client
 
 class AiMailGenerator:
     """Class to generate AI-powered emails"""
@@ -13,7 +13,7 @@ class AiMailGenerator:
         self.data_path = self.base_path / "src" / "data"
         self.responses_path = self.data_path / "responses"
         self.ai_mails_path = self.responses_path / "ai_mails"
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.llm = get_llm_client()
         self.temp_email = None
         
         # Ensure directory exists
@@ -42,10 +42,19 @@ class AiMailGenerator:
             print(f"Error saving AI email: {e}")
             return None
     
-    def generate_email(self, description, context, company_name=None, position_name=None):
-        """Generate an email based on the provided description and context"""
+    def generate_email(self, description, context, company_name=None, position_name=None, application_context=None):
+        """Generate an email based on the provided description and context.
+        
+        When application_context is given, context should only hold what it doesn't already
+        carry (for example an instruction to rely on the resume and job description above).
+        """
+        return collect_stream(self.stream_email(description, context, company_name, position_name, application_context))
+    
+    def stream_email(self, description, context, company_name=None, position_name=None, application_context=None):
+        """Like generate_email, yielding the email so far as it is generated"""
         if not description or not context:
-            return "Error: Missing description or context."
+            yield "Error: Missing description or context."
+            return
         
         # Create prompt for the model
         prompt = f"""
@@ -74,12 +83,19 @@ class AiMailGenerator:
         """
 
         try:
-            response = self.model.generate_content(prompt)
-            email_content = response.text.strip()
+            if application_context is not None:
+                chunks = application_context.stream_text(prompt, label="ai_mail.generate")
+            else:
+                chunks = self.llm.stream_text(prompt, label="ai_mail.generate")
+            email_content = ""
+            for chunk in chunks:
+                email_content += chunk
+                yield email_content
+            email_content = email_content.strip()
             
             # Store the generated email
             self.temp_email = email_content
             
-            return email_content
+            yield email_content
         except Exception as e:
-            return f"Error generating email: {str(e)}"
\ No newline at end of file
+            yield f"Error generating email: {str(e)}"
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from ..llm_client import get_llm_client
+from ..metrics import get_metrics
+from ..prompt_budget import estimate_tokens
+from ..single_flight import SingleFlight
+
+
+PROFILE_VERSION = 1  # Bump whenever the prompt or the profile format changes to rebuild stored profiles
+FAILED_BUILD_RETRY_DELAY = 300  # Seconds before a resume whose profile couldn't be built is tried again
+
+
+class CandidateProfileGenerator:
+    """Distils a resume into a compact structured profile that the other generators use instead of the raw text.
+
+    Profiles are built once per resume content and stored as JSON in src/data/user_resume/profiles,
+    keyed by a hash of the extracted text, so they survive restarts.
+    """
+
+    def __init__(self):
+        self.llm = get_llm_client()
+        self.base_path = Path(__file__).parent.parent.parent.parent
+        self.data_path = self.base_path / "src" / "data"
+        self.profiles_path = self.data_path / "user_resume" / "profiles"
+        self._profiles = {}  # Profile text by key, for this session
+        self._failed_builds = {}  # Time of the last failed build by key
+        self._lock = threading.Lock()  # Guards the two dicts only; builds run outside it
+        self._flights = SingleFlight()  # Concurrent requests for one resume share its build
+
+        # Ensure directory exists
+        self.profiles_path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def get_profile_key(resume_content):
+        """Key a profile by the resume text it was built from"""
+        data = json.dumps([PROFILE_VERSION, resume_content])
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def get_profile(self, resume_content):
+        """Return the compact profile for this resume, building it on first use.
+
+        Falls back to the resume text itself if the profile can't be built or wouldn't be smaller.
+        """
+        if not resume_content or not resume_content.strip():
+            return resume_content
+
+        key = self.get_profile_key(resume_content)
+        with self._lock:
+            profile = self._profiles.get(key)
+            failed_at = self._failed_builds.get(key)
+        if profile is None and (failed_at is None or time.time() - failed_at >= FAILED_BUILD_RETRY_DELAY):
+            profile = self._flights.do(key, self._load_or_build_profile, key, resume_content)
+
+        if not profile or estimate_tokens(profile) >= estimate_tokens(resume_content):
+            return resume_content
+        return profile
+
+    def _load_or_build_profile(self, key, resume_content):
+        """Read the stored profile or build it, remembering the result (or the failure) for this session"""
+        profile = self._load_profile(key)
+        get_metrics().record_cache("candidate_profile", "cache", profile is not None)
+        if profile is None:
+            profile = self._build_profile(key, resume_content)
+
+        with self._lock:
+            if profile:
+                self._profiles[key] = profile
+                self._failed_builds.pop(key, None)
+            else:
+                self._failed_builds[key] = time.time()
+        return profile
+
+    def _load_profile(self, key):
+        """Read a stored profile, or None if there isn't a readable one"""
+        profile_file = self.profiles_path / f"profile_{key}.json"
+        if not profile_file.exists():
+            return None
+        try:
+            with open(profile_file, 'r', encoding='utf-8') as f:
+                return self.format_profile(json.load(f)['profile'])
+        except Exception:
+            # If the stored profile is unreadable, build it again
+            return None
+
+    def _save_profile(self, key, profile):
+        """Store a profile next to the resumes"""
+        profile_file = self.profiles_path / f"profile_{key}.json"
+        tmp_file = profile_file.with_name(f"{profile_file.name}.{os.getpid()}.tmp")
+        try:
+            # Write to a temporary file and rename it so readers never see a partial profile
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': PROFILE_VERSION, 'profile': profile, 'timestamp': time.time()}, f, indent=2)
+            os.replace(tmp_file, profile_file)
+        except Exception as e:
+            print(f"Profile saving error: {str(e)}")
+
+    def _build_profile(self, key, resume_content):
+        """Ask the model for the structured profile; returns its text, or "" if that fails"""
+        prompt = f"""
+        You are an expert resume analyst. The resume below was extracted from a PDF or Word file and may contain
+        layout noise: broken lines, repeated headers and footers, stray symbols or columns run together.
+
+        Distil it into a compact, faithful profile of the candidate. Use only information that is in the resume;
+        never invent or embellish anything. Keep every employer, title, date, degree, skill and number exactly as written.
+
+        Resume:
+        {resume_content}
+
+        Respond with ONLY a JSON object of this form (use empty strings or lists for anything missing):
+        {{
+            "name": "<full name>",
+            "contact": {{"email": "", "phone": "", "location": "", "links": ["<LinkedIn, GitHub, portfolio URLs>"]}},
+            "summary": "<one or two sentences on who the candidate is professionally>",
+            "roles": [{{"title": "", "company": "", "location": "", "start": "", "end": "",
+                       "bullets": ["<one line per achievement or responsibility, keeping its metrics>"]}}],
+            "education": [{{"degree": "", "institution": "", "start": "", "end": "", "details": ""}}],
+            "projects": [{{"name": "", "description": ""}}],
+            "certifications": ["<certification>"],
+            "skills": ["<skill>"],
+            "metrics": ["<the most impressive quantified achievements, e.g. 'Cut p95 latency by 40%'>"]
+        }}
+        """
+
+        try:
+            text = self.llm.generate_text(prompt, generation_config={
+                "temperature": 0.1,
+                "response_mime_type": "application/json"
+            }, label="candidate_profile.build")
+            # Tolerate a markdown code fence around the JSON
+            text = re.sub(r'^\s*```(?:json)?\s*|\s*```\s*$', '', text)
+            profile = json.loads(text)
+            if not isinstance(profile, dict):
+                raise ValueError("the profile is not a JSON object")
+            formatted = self.format_profile(profile)
+        except Exception as e:
+            print(f"Error building candidate profile: {str(e)}")
+            return ""
+
+        self._save_profile(key, profile)
+        return formatted
+
+    @staticmethod
+    def format_profile(profile):
+        """Render a structured profile as compact text for prompts, one paragraph per part"""
+        def text(value):
+            return str(value).strip() if value else ""
+
+        def items(value):
+            return [item for item in value if item] if isinstance(value, list) else []
+
+        def dates(entry):
+            start, end = text(entry.get('start')), text(entry.get('end'))
+            return f" ({start} - {end})" if start and end else f" ({start or end})" if start or end else ""
+
+        lines = []
+        if text(profile.get('name')):
+            lines.append(f"Name: {text(profile.get('name'))}")
+
+        contact = profile.get('contact') if isinstance(profile.get('contact'), dict) else {}
+        contact_parts = [text(contact.get(field)) for field in ('email', 'phone', 'location')]
+        contact_parts += [text(link) for link in items(contact.get('links'))]
+        if any(contact_parts):
+            lines.append("Contact: " + " | ".join(part for part in contact_parts if part))
+
+        if text(profile.get('summary')):
+            lines.append(f"Summary: {text(profile.get('summary'))}")
+
+        roles = [role for role in items(profile.get('roles')) if isinstance(role, dict)]
+        if roles:
+            lines.extend(["", "Experience:"])
+            for role in roles:
+                heading = ", ".join(part for part in (text(role.get('title')), text(role.get('company')),
+                                                      text(role.get('location'))) if part)
+                lines.append(f"- {heading}{dates(role)}")
+                lines.extend(f"  * {text(bullet)}" for bullet in items(role.get('bullets')))
+
+        education = [entry for entry in items(profile.get('education')) if isinstance(entry, dict)]
+        if education:
+            lines.extend(["", "Education:"])
+            for entry in education:
+                heading = ", ".join(part for part in (text(entry.get('degree')), text(entry.get('institution'))) if part)
+                details = f": {text(entry.get('details'))}" if text(entry.get('details')) else ""
+                lines.append(f"- {heading}{dates(entry)}{details}")
+
+        projects = [project for project in items(profile.get('projects')) if isinstance(project, dict)]
+        if projects:
+            lines.extend(["", "Projects:"])
+            for project in projects:
+                description = f": {text(project.get('description'))}" if text(project.get('description')) else ""
+                lines.append(f"- {text(project.get('name'))}{description}")
+
+        if items(profile.get('certifications')):
+            lines.extend(["", "Certifications: " + "; ".join(text(item) for item in items(profile.get('certifications')))])
+        if items(profile.get('skills')):
+            lines.extend(["", "Skills: " + ", ".join(text(item) for item in items(profile.get('skills')))])
+        if items(profile.get('metrics')):
+            lines.extend(["", "Key metrics:"])
+            lines.extend(f"- {text(metric)}" for metric in items(profile.get('metrics')))
+
+        return "\n".join(lines).strip()
@@ -2,7 +2,29 @@ from pathlib import Path
 import os
 import re
 import time
-import google.generativeai as genai
+from ..llm_client import collect_stream, get_llm_client
+from ..prompt_budget import JOB_KEYWORDS, RESUME_KEYWORDS, PromptSection, fit_sections
+from ..section_classifier import BOILERPLATE_LABELS
+
+
+PROMPT_TOKEN_BUDGET = 3000  # Job description, resume highlights and conversation history together
+NOTES_DELIMITER = "---ADDITIONAL NOTES---"
+
+
+def split_response(text):
+    """Split a (possibly partial) response into its main content and additional notes"""
+    main_content, found, additional_notes = text.partition(NOTES_DELIMITER)
+    if not found:
+        # Mid-stream, hide a delimiter that has only partly arrived
+        for length in range(len(NOTES_DELIMITER) - 1, 0, -1):
+            if main_content.endswith(NOTES_DELIMITER[:length]):
+                main_content = main_content[:-length]
+                break
+    return {
+        "main_content": main_content.strip(),
+        "additional_notes": additional_notes.strip()
+    }
+
 
 class ChatbotGenerator:
     """Class for generating chat responses for job application assistance"""
@@ -14,6 +36,7 @@ class ChatbotGenerator:
         self.responses_path = self.data_path / "responses"
         self.chat_logs_path = self.responses_path / "chat_logs"
         self.chat_history = []
+        self.llm = get_llm_client()
         
         # Ensure directory exists
         self.chat_logs_path.mkdir(parents=True, exist_ok=True)
@@ -43,32 +66,54 @@ class ChatbotGenerator:
             print(f"Error creating file: {e}")
             return f"Error saving chat history: {str(e)}"
     
-    def generate_response(self, user_message, job_description=None, resume_content=None, company_name=None, position_name=None):
-        """Generate a response to the user's message"""
+    def generate_response(self, user_message, job_description=None, resume_content=None, company_name=None, position_name=None, context=None):
+        """Generate a response to the user's message (the resume and job description come from context if given)"""
+        return collect_stream(self.stream_response(user_message, job_description, resume_content, company_name,
+                                                   position_name, context))
+    
+    def stream_response(self, user_message, job_description=None, resume_content=None, company_name=None, position_name=None, context=None):
+        """Like generate_response, yielding the response so far as it is generated"""
         if not user_message:
-            return "Please provide a message to respond to."
+            yield "Please provide a message to respond to."
+            return
+        
+        # Unless the context is uploaded once, sending it costs more than the budgeted excerpts
+        if context is not None and not context.saves_tokens(PROMPT_TOKEN_BUDGET):
+            context = None
+        if context is not None:
+            job_description = resume_content = None
+        
+        # Include up to the last 5 exchanges for context, one paragraph per message
+        history = "\n\n".join(f"{message['role']}: {message['content']}" for message in self.chat_history[-10:])
+        
+        # Fit everything into the budget: the resume is trimmed first, then the job description;
+        # the most recent conversation is kept longest
+        texts = fit_sections([
+            PromptSection('resume', resume_content or "", priority=1, min_tokens=125, keywords=RESUME_KEYWORDS),
+            PromptSection('job_description', job_description or "", priority=2, min_tokens=250, keywords=JOB_KEYWORDS,
+                          drop_labels=BOILERPLATE_LABELS),
+            PromptSection('history', history, priority=3, keep='tail'),
+        ], PROMPT_TOKEN_BUDGET)
         
         # Add context about the job if available
         job_context = ""
-        if job_description:
-            job_context += f"\nJob Description: {job_description[:1000]}"
+        if context is not None:
+            job_context += "\nThe candidate's resume and the job description are provided above."
+        if texts['job_description']:
+            job_context += f"\nJob Description: {texts['job_description']}"
         if company_name:
             job_context += f"\nCompany: {company_name}"
         if position_name:
             job_context += f"\nPosition: {position_name}"
-        if resume_content:
-            job_context += f"\nResume Highlights: {resume_content[:500]}"
+        if texts['resume']:
+            job_context += f"\nResume Highlights: {texts['resume']}"
         
         # Store the conversation history for context
         history_context = ""
-        if self.chat_history:
-            history_context = "\nPrevious conversation:\n"
-            # Include up to the last 5 exchanges for context
-            for message in self.chat_history[-10:]:
-                history_context += f"{message['role']}: {message['content']}\n"
+        if texts['history']:
+            history_context = f"\nPrevious conversation:\n{texts['history']}\n"
         
         # Generate the response using Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
         prompt = f"""
         You are a helpful job application assistant. Your goal is to help the user with their job application process.
         
@@ -92,32 +137,32 @@ class ChatbotGenerator:
         1. Main Content: The primary response or template
         2. Additional Notes: Any tips, instructions, or follow-up questions (if applicable)
         
-        Separate these parts with a clear delimiter: "---ADDITIONAL NOTES---"
+        Separate these parts with a clear delimiter: "{NOTES_DELIMITER}"
         """
         
         try:
-            response = model.generate_content(prompt)
-            bot_response = response.text
-            
-            # Split the response into main content and additional notes
-            parts = bot_response.split("---ADDITIONAL NOTES---")
-            main_content = parts[0].strip()
-            additional_notes = parts[1].strip() if len(parts) > 1 else ""
+            if context is not None:
+                chunks = context.stream_text(prompt, label="chatbot.respond")
+            else:
+                chunks = self.llm.stream_text(prompt, label="chatbot.respond")
+            bot_response = ""
+            response = split_response(bot_response)
+            for chunk in chunks:
+                bot_response += chunk
+                response = split_response(bot_response)
+                yield response
             
             # Update chat history with the main content only
             self.chat_history.append({"role": "user", "content": user_message})
-            self.chat_history.append({"role": "assistant", "content": main_content})
+            self.chat_history.append({"role": "assistant", "content": response["main_content"]})
             
-            # Return both parts
-            return {
-                "main_content": main_content,
-                "additional_notes": additional_notes
-            }
+            # Yield the final response once more, so a stream with no text still produces one
+            yield response
         except Exception as e:
             error_message = f"Error generating response: {str(e)}"
             self.chat_history.append({"role": "user", "content": user_message})
             self.chat_history.append({"role": "assistant", "content": error_message})
-            return {
+            yield {
                 "main_content": error_message,
                 "additional_notes": ""
             }
@@ -2,7 +2,12 @@ from pathlib import Path
 import os
 import re
 import time
-import google.generativeai as genai
+from ..llm_client import collect_stream, get_llm_client
+from ..prompt_budget import fit_resume_and_job
+
+
+PROMPT_TOKEN_BUDGET = 600  # Resume and job description highlights together
+
 
 class ColdMailGenerator:
     """Class for generating cold emails to hiring managers"""
@@ -14,6 +19,7 @@ class ColdMailGenerator:
         self.responses_path = self.data_path / "responses"
         self.cold_mails_path = self.responses_path / "cold_mails"
         self.temp_cold_mail = None
+        self.llm = get_llm_client()
         
         # Ensure directory exists
         self.cold_mails_path.mkdir(parents=True, exist_ok=True)
@@ -39,29 +45,46 @@ class ColdMailGenerator:
             print(f"Error creating file: {e}")
             return None
     
-    def generate_cold_mail(self, resume_content, job_description, hr_name, company_name, position_name):
-        """Generate a cold mail to a hiring manager"""
+    def generate_cold_mail(self, resume_content, job_description, hr_name, company_name, position_name, context=None):
+        """Generate a cold mail to a hiring manager (sending only the task prompt if a shared context is given)"""
+        return collect_stream(self.stream_cold_mail(resume_content, job_description, hr_name, company_name, position_name, context))
+    
+    def stream_cold_mail(self, resume_content, job_description, hr_name, company_name, position_name, context=None):
+        """Like generate_cold_mail, yielding the cold mail so far as it is generated"""
         if not resume_content or not job_description:
-            return "Please provide resume content and job description."
+            yield "Please provide resume content and job description."
+            return
         
         if not company_name or not position_name:
-            return "Please provide both company name and position title."
+            yield "Please provide both company name and position title."
+            return
+        
+        # Unless the context is uploaded once, sending it costs more than the highlights this needs
+        if context is not None and not context.saves_tokens(PROMPT_TOKEN_BUDGET):
+            context = None
         
         # Format HR name (use "Hiring Manager" if not provided)
         greeting_name = hr_name.strip() if hr_name and hr_name.strip() else "Hiring Manager"
         
+        # The shared context already carries the full resume and job description
+        if context is not None:
+            resume_highlights = "Use the resume and job description provided above."
+            job_highlights = "See the job description above."
+        else:
+            # A short email only needs highlights of each
+            resume_highlights, job_highlights = fit_resume_and_job(resume_content, job_description, PROMPT_TOKEN_BUDGET)
+        
         # Generate the cold mail using Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
         prompt = f"""
         Create a professional cold email to send to a hiring manager or recruiter.
         
         Resume highlights:
-        {resume_content[:1000]}  # Using first 1000 chars of resume for brevity
+        {resume_highlights}
         
         Job details:
         Position: {position_name}
         Company: {company_name}
-        Job Description Highlights: {job_description[:1000]}  # Using first 1000 chars
+        Job Description Highlights: {job_highlights}
         
         The email should:
         1. Be addressed to {greeting_name}
@@ -76,9 +99,15 @@ class ColdMailGenerator:
         """
         
         try:
-            response = model.generate_content(prompt)
-            cold_mail = response.text
+            if context is not None:
+                chunks = context.stream_text(prompt, label="cold_mail.generate")
+            else:
+                chunks = self.llm.stream_text(prompt, label="cold_mail.generate")
+            cold_mail = ""
+            for chunk in chunks:
+                cold_mail += chunk
+                yield cold_mail
             self.temp_cold_mail = cold_mail
-            return cold_mail
+            yield cold_mail
         except Exception as e:
-            return f"Error generating cold mail: {str(e)}"
\ No newline at end of file
+            yield f"Error generating cold mail: {str(e)}"
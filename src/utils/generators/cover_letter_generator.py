@@ -4,20 +4,25 @@ import os
 import time
 import re
 from datetime import date
-import google.generativeai as genai
 from pathlib import Path
+from ..llm_client import collect_stream, get_llm_client
+from ..metrics import get_metrics
+from ..prompt_budget import MAX_PROMPT_TOKENS, fit_resume_and_job
 
 
 # Constants
-MAX_TOKEN_LENGTH = 8000  # Adjust based on model limits
-CACHE_EXPIRY = 60
+CACHE_EXPIRY = 120  # Default TTL in seconds, matching src/config.py
+# Bump whenever the prompt, its inputs (how the resume and job description are condensed or budgeted)
+# or post-processing change, to invalidate cached letters
+PROMPT_VERSION = 2
 
 
 class CoverLetterGenerator:
     """Class to handle cover letter generation operations"""
     
-    def __init__(self):
-        self.model_name = 'gemini-2.0-flash'
+    def __init__(self, cache_expiry=CACHE_EXPIRY):
+        self.llm = get_llm_client()
+        self.cache_expiry = cache_expiry
         self.base_path = Path(__file__).parent.parent.parent.parent
         self.data_path = self.base_path / "src" /"data"
         self.cache_path = self.data_path / "cache"
@@ -25,14 +30,35 @@ class CoverLetterGenerator:
         # Ensure cache directory exists
         self.cache_path.mkdir(parents=True, exist_ok=True)
     
+    @staticmethod
+    def get_cache_key(resume_content, job_description, company_name, position_name, today):
+        """Build a deterministic cache key from whitespace-normalized inputs and the prompt version"""
+        def normalize(text):
+            return re.sub(r'\s+', ' ', text).strip()
+        
+        data = json.dumps([
+            PROMPT_VERSION,
+            normalize(resume_content),
+            normalize(job_description),
+            normalize(company_name),  # Not case-folded: the names appear verbatim in the letter
+            normalize(position_name),
+            today,  # The letter is dated, so a cached one is only valid on the day it was written
+        ])
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+    
     def check_cache(self, cache_key):
         """Check if there's a cached response for this query"""
-        cache_file = self.cache_path / f"{cache_key}.json"
+        cover_letter = self._read_cache(cache_key)
+        get_metrics().record_cache("cover_letter", "cache", cover_letter is not None)
+        return cover_letter
+    
+    def _read_cache(self, cache_key):
+        cache_file = self.cache_path / f"cover_letter_{cache_key}.json"
         
         if cache_file.exists():
             # Check if cache is expired
             file_age = time.time() - cache_file.stat().st_mtime
-            if file_age < CACHE_EXPIRY:
+            if file_age < self.cache_expiry:
                 try:
                     with open(cache_file, 'r', encoding='utf-8') as f:
                         cache_data = json.load(f)
@@ -44,58 +70,30 @@ class CoverLetterGenerator:
     
     def save_to_cache(self, cache_key, cover_letter):
         """Save the generated cover letter to cache"""
-        cache_file = self.cache_path / f"{cache_key}.json"
+        cache_file = self.cache_path / f"cover_letter_{cache_key}.json"
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
+            # Write to a temporary file and rename it so readers never see a partial entry
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump({'cover_letter': cover_letter, 'timestamp': time.time()}, f)
+            os.replace(tmp_file, cache_file)
         except Exception as e:
             print(f"Cache saving error: {str(e)}")
     
-    def truncate_text(self, text, max_chars=MAX_TOKEN_LENGTH):
-        """Truncate text to stay within token limits"""
-        if len(text) <= max_chars:
-            return text
-        
-        # More intelligent truncation that tries to preserve key resume sections
-        # Look for section headers and preserve the most relevant ones
-        sections = re.split(r'\n\s*\n|\r\n\s*\r\n', text)
-        
-        important_keywords = ['experience', 'education', 'skills', 'projects', 'publications']
-        prioritized_sections = []
-        other_sections = []
-        
-        for section in sections:
-            if any(keyword.lower() in section.lower() for keyword in important_keywords):
-                prioritized_sections.append(section)
-            else:
-                other_sections.append(section)
-        
-        # Combine sections up to the max length limit
-        result = ""
-        remaining_chars = max_chars - 50  # leave some buffer
-        
-        # First add prioritized sections
-        for section in prioritized_sections:
-            if len(section) + len(result) < remaining_chars:
-                result += section + "\n\n"
-            else:
-                # If section is too long, truncate it
-                available_space = remaining_chars - len(result)
-                if available_space > 100:  # Only add if we have meaningful space
-                    result += section[:available_space] + "...\n\n"
-                break
-        
-        # Then add other sections if space remains
-        for section in other_sections:
-            if len(section) + len(result) < remaining_chars:
-                result += section + "\n\n"
-            else:
-                break
-        
-        return result.strip() + "\n...[content intelligently truncated to fit token limits]"
+    def generate_cover_letter(self, resume_content, job_description, company_name, position_name, use_cache=True):
+        """Generate cover letter using Gemini API.
+        
+        With use_cache=False a fresh letter is always generated (and replaces the cached one).
+        """
+        return collect_stream(self.stream_cover_letter(
+            resume_content, job_description, company_name, position_name, use_cache=use_cache
+        ))
     
-    def generate_cover_letter(self, resume_content, job_description, company_name, position_name):
-        """Generate cover letter using Gemini API"""
+    def stream_cover_letter(self, resume_content, job_description, company_name, position_name, use_cache=True):
+        """Like generate_cover_letter, yielding the letter so far as it is generated.
+        
+        The last value yielded is the post-processed letter.
+        """
         # Input validation
         for input_name, input_value in [
             ("resume", resume_content),
@@ -104,14 +102,22 @@ class CoverLetterGenerator:
             ("position name", position_name)
         ]:
             if not input_value or input_value.strip() == "":
-                return f"Please provide a valid {input_name}."
+                yield f"Please provide a valid {input_name}."
+                return
         
         # Prepare data
         today = date.today().strftime("%B %d, %Y")
         
-        # Use provided content directly
-        processed_resume = resume_content
-        processed_job = job_description       
+        cache_key = self.get_cache_key(resume_content, job_description, company_name, position_name, today)
+        if use_cache:
+            cached_letter = self.check_cache(cache_key)
+            if cached_letter:
+                print("Using cached cover letter")
+                yield cached_letter
+                return
+        
+        # Keep the resume and job description within the prompt's token budget
+        processed_resume, processed_job = fit_resume_and_job(resume_content, job_description, MAX_PROMPT_TOKENS)
 
         # Create the prompt for Gemini
         prompt = f"""
@@ -140,28 +146,31 @@ class CoverLetterGenerator:
         """
         
         try:
-            # Initialize Gemini model with system message to improve quality
-            model = genai.GenerativeModel(self.model_name, 
-                                        generation_config={
-                                            "temperature": 0.7,
-                                            "top_p": 0.9,
-                                            "top_k": 40
-                                        })
+            # Generate the cover letter, showing it as it arrives
+            cover_letter = ""
+            for chunk in self.llm.stream_text(prompt, generation_config={
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "top_k": 40
+            }, label="cover_letter.generate"):
+                cover_letter += chunk
+                yield cover_letter
             
-            # Generate the cover letter
-            response = model.generate_content(prompt)
+            # Never post-process or cache an empty response (e.g. blocked by safety filters)
+            if not cover_letter.strip():
+                yield "Error generating cover letter: the model returned an empty response. Please try again."
+                return
             
-            # Process the response
-            cover_letter = response.text.strip()
+            # Post-processing to ensure proper formatting, once the whole letter is known
+            cover_letter = self.post_process_letter(cover_letter.strip(), today, company_name)
             
-            # Post-processing to ensure proper formatting
-            cover_letter = self.post_process_letter(cover_letter, today, company_name)
+            self.save_to_cache(cache_key, cover_letter)
             
-            return cover_letter
+            yield cover_letter
         
         except Exception as e:
             error_message = str(e)
-            return f"Error generating cover letter: {error_message}"
+            yield f"Error generating cover letter: {error_message}"
     
 
     def post_process_letter(self, cover_letter, today, company_name):
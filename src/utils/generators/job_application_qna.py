@@ -1,21 +1,38 @@
 from datetime import date
-import google.generativeai as genai
 import hashlib
 import os
 import re
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from ..answer_index import AnswerIndex, content_words
+from ..llm_client import collect_stream, get_llm_client
+from ..metrics import get_metrics
+from ..prompt_budget import MAX_PROMPT_TOKENS, fit_resume_and_job
 
 
 CACHE_EXPIRY = 60  
+# Questions answered at once in a batch; the shared LLM client's own cap and retry backoff
+# still apply on top of this, so a batch never exceeds the app-wide request limit
+BATCH_MAX_CONCURRENT = 4
+# Extra requests made in single-call mode for answers missing or invalid in the first response
+SINGLE_CALL_RETRIES = 2
+# Similarity to an earlier question for the same job above which its answer may be reused as is.
+# Character n-grams score opposite or differently targeted questions ("...failed to lead a team"
+# vs "...led a team", Canada vs the US) well above 0.6, so only rewordings with the same content
+# words qualify ("work on weekends" vs "work weekends").
+REUSE_SIMILARITY = 0.9
+# Above this similarity, the earlier answer is shown to the model as a starting point; the prompt
+# still carries the resume and job description, and the model decides what of it applies
+ADAPT_SIMILARITY = 0.45
 
 
 class JobApplicationQnA:
     """Class to handle job application Q&A operations"""
     
     def __init__(self):
-        self.model_name = 'gemini-2.0-flash'
+        self.llm = get_llm_client()
         self.base_path = Path(__file__).parent.parent.parent.parent
         self.data_path = self.base_path / "src" /"data"
         self.responses_path = self.data_path / "responses"
@@ -25,9 +42,17 @@ class JobApplicationQnA:
         # Ensure directories exist
         self.qna_path.mkdir(parents=True, exist_ok=True)
         self.cache_path.mkdir(parents=True, exist_ok=True)
+        
+        # Past answers, searchable by question similarity
+        self.answer_index = AnswerIndex(self.cache_path / "qna_answer_index.json")
 
     def check_cache(self, cache_key):
         """Check if there's a cached response for this query"""
+        answer = self._read_cache(cache_key)
+        get_metrics().record_cache("qna", "cache", answer is not None)
+        return answer
+    
+    def _read_cache(self, cache_key):
         cache_file = self.cache_path / f"qna_{cache_key}.json"
         
         if cache_file.exists():
@@ -96,8 +121,18 @@ class JobApplicationQnA:
             print(f"Error saving custom Q&A: {e}")
             return None
     
-    def generate_answer(self, resume_content, job_description, question, company_name, position_name, word_limit=None):
-        """Generate answer to a job application question using Gemini API"""
+    def generate_answer(self, resume_content, job_description, question, company_name, position_name, word_limit=None, context=None):
+        """Generate answer to a job application question using Gemini API.
+        
+        With an ApplicationContext holding the resume and job description, only the
+        question-specific part of the prompt is sent.
+        """
+        return collect_stream(self.stream_answer(
+            resume_content, job_description, question, company_name, position_name, word_limit, context
+        ))
+    
+    def stream_answer(self, resume_content, job_description, question, company_name, position_name, word_limit=None, context=None):
+        """Like generate_answer, yielding the answer so far as it is generated"""
         # Input validation
         for input_name, input_value in [
             ("resume", resume_content),
@@ -107,7 +142,8 @@ class JobApplicationQnA:
             ("position name", position_name)
         ]:
             if not input_value or input_value.strip() == "":
-                return f"Please provide a valid {input_name}."
+                yield f"Please provide a valid {input_name}."
+                return
         
         # Create the cache key
         cache_key = self.get_cache_key(resume_content, job_description, question, company_name, position_name, word_limit)
@@ -115,24 +151,40 @@ class JobApplicationQnA:
         # Check cache for existing response
         cached_response = self.check_cache(cache_key)
         if cached_response:
-            return cached_response
+            yield cached_response
+            return
+        
+        # Near-duplicates of questions already answered for this job reuse those answers
+        scope = self.get_scope_key(resume_content, job_description, company_name, position_name)
+        similar = self.answer_index.find(scope, question)
+        get_metrics().record_cache("qna", "similar_answer", self.can_reuse(similar, question, word_limit))
+        if self.can_reuse(similar, question, word_limit):
+            print(f"Reusing the answer to a similar question: {similar.question}")
+            answer = self.ensure_word_limit(similar.answer, word_limit) if word_limit else similar.answer
+            self.save_to_cache(cache_key, answer)
+            yield answer
+            return
+        related = similar if similar is not None and similar.similarity >= ADAPT_SIMILARITY else None
             
+        # The resume and job description are already part of a shared context, if one is given
+        if context is not None:
+            materials = "Use the resume and job description provided above."
+        else:
+            resume_content, job_description = fit_resume_and_job(resume_content, job_description, MAX_PROMPT_TOKENS)
+            materials = f"Resume:\n{resume_content}\n\nJob Description:\n{job_description}"
+        
         # Create the prompt for Gemini
         prompt = f"""
         You are a professional job application specialist. Your task is to help a candidate create a personalized answer to a job application question.
         
-        Resume:
-        {resume_content}
-        
-        Job Description:
-        {job_description}
+        {materials}
         
         Position: {position_name} at {company_name}
         
         Job Application Question: "{question}"
         
         {f'Word Limit: {word_limit} words' if word_limit else ''}
-        
+        {self._related_answer_instructions(related)}
         Write a compelling, specific, and personalized answer to this question that:
         1. Directly addresses what the question is asking
         2. Connects relevant experiences from the resume to the job requirements
@@ -148,19 +200,22 @@ class JobApplicationQnA:
         """
         
         try:
-            # Initialize Gemini model
-            model = genai.GenerativeModel(self.model_name, 
-                                        generation_config={
-                                            "temperature": 0.7,
-                                            "top_p": 0.9,
-                                            "top_k": 40
-                                        })
-            
             # Generate the answer
-            response = model.generate_content(prompt)
-            
-            # Process the response
-            answer = response.text.strip()
+            generation_config = {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "top_k": 40
+            }
+            label = "qna.adapt" if related is not None else "qna.answer"
+            if context is not None:
+                chunks = context.stream_text(prompt, generation_config, label=label)
+            else:
+                chunks = self.llm.stream_text(prompt, generation_config, label=label)
+            answer = ""
+            for chunk in chunks:
+                answer += chunk
+                yield answer
+            answer = answer.strip()
             
             # Post-processing to ensure proper formatting and word count
             if word_limit:
@@ -168,12 +223,204 @@ class JobApplicationQnA:
             
             # Save to cache
             self.save_to_cache(cache_key, answer)
+            self.answer_index.add(scope, question, answer, word_limit)
             
-            return answer
+            yield answer
         
         except Exception as e:
             error_message = str(e)
-            return f"Error generating answer: {error_message}"
+            yield f"Error generating answer: {error_message}"
+    
+    @staticmethod
+    def _related_answer_instructions(related):
+        """Prompt text offering an earlier answer to a related question as a starting point"""
+        if related is None:
+            return ""
+        return f"""
+        The candidate already answered a related question for this application:
+        Earlier question: "{related.question}"
+        Earlier answer: {related.answer}
+        Adapt the earlier answer where it genuinely answers the new question, keeping its examples and tone
+        consistent, but check every claim against the resume and job description above. The questions may
+        differ in what they ask (a negation, another country, language or topic): answer the new question,
+        not the earlier one, and ignore the earlier answer entirely if it does not apply.
+        """
+    
+    @staticmethod
+    def can_reuse(similar, question, word_limit):
+        """Whether a similar earlier answer can be served as is for this question and word limit.
+        
+        The questions must differ only in punctuation, case or filler words: a negation, a different
+        country, language or topic is a different question.
+        """
+        return (similar is not None and similar.similarity >= REUSE_SIMILARITY
+                and content_words(similar.question) == content_words(question)
+                and (not word_limit or len(similar.answer.split()) <= word_limit))
+    
+    def generate_answers(self, resume_content, job_description, questions, company_name, position_name, word_limit=None,
+                         context=None, max_concurrent=BATCH_MAX_CONCURRENT):
+        """Answer several questions concurrently, yielding (index, answer) pairs as each one finishes.
+        
+        A question that fails is answered with an error message; the rest of the batch carries on.
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrent, len(questions))),
+                                      thread_name_prefix="qna-batch")
+        try:
+            futures = {
+                executor.submit(self.generate_answer, resume_content, job_description, question,
+                                company_name, position_name, word_limit, context): index
+                for index, question in enumerate(questions)
+            }
+            for future in as_completed(futures):
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    answer = f"Error generating answer: {str(e)}"
+                yield futures[future], answer
+        finally:
+            # If the caller stops early, don't start questions nobody is waiting for
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def generate_answers_in_one_call(self, resume_content, job_description, questions, company_name, position_name,
+                                     word_limit=None, context=None, retries=SINGLE_CALL_RETRIES):
+        """Answer several questions with a single request, yielding (index, answer) pairs.
+        
+        The resume and job description are sent once for the whole batch and the model returns
+        a JSON array of answers. Answers missing from the response, or invalid, are asked for
+        again on their own (up to `retries` more requests); any still unanswered after that fall
+        back to one request per question. word_limit is either one limit for every question or
+        a list with one limit (or None) per question. Cached answers are yielded first.
+        """
+        if word_limit is None or isinstance(word_limit, int):
+            word_limits = [word_limit] * len(questions)
+        else:
+            word_limits = list(word_limit)
+        
+        # Serve what is already cached, or answered for a near-identical question; only the rest go into the request
+        scope = self.get_scope_key(resume_content, job_description, company_name, position_name)
+        pending = {}
+        for index, question in enumerate(questions):
+            cache_key = self.get_cache_key(
+                resume_content, job_description, question, company_name, position_name, word_limits[index]
+            )
+            cached_response = self.check_cache(cache_key)
+            similar = None if cached_response else self.answer_index.find(scope, question)
+            if not cached_response:
+                get_metrics().record_cache("qna", "similar_answer", self.can_reuse(similar, question, word_limits[index]))
+            if cached_response:
+                yield index, cached_response
+            elif self.can_reuse(similar, question, word_limits[index]):
+                answer = similar.answer
+                if word_limits[index]:
+                    answer = self.ensure_word_limit(answer, word_limits[index])
+                self.save_to_cache(cache_key, answer)
+                yield index, answer
+            else:
+                pending[index] = question
+        
+        for attempt in range(retries + 1):
+            if not pending:
+                return
+            try:
+                answers = self._request_json_answers(resume_content, job_description, pending, word_limits,
+                                                     company_name, position_name, context)
+            except Exception as e:
+                print(f"Error generating answers in one request: {str(e)}")
+                answers = {}
+            
+            for index, answer in answers.items():
+                question = pending.pop(index)
+                if word_limits[index]:
+                    answer = self.ensure_word_limit(answer, word_limits[index])
+                self.save_to_cache(self.get_cache_key(
+                    resume_content, job_description, question, company_name, position_name, word_limits[index]
+                ), answer)
+                self.answer_index.add(scope, question, answer, word_limits[index])
+                yield index, answer
+            
+            if pending and attempt < retries:
+                print(f"Asking again for {len(pending)} missing or invalid answer(s)")
+        
+        # Whatever the combined requests couldn't answer is answered one at a time
+        for index, question in pending.items():
+            yield index, self.generate_answer(resume_content, job_description, question, company_name,
+                                              position_name, word_limits[index], context=context)
+    
+    def _request_json_answers(self, resume_content, job_description, questions, word_limits, company_name,
+                              position_name, context=None):
+        """Ask for answers to {index: question} as a JSON array and return the valid ones by index"""
+        # The resume and job description are already part of a shared context, if one is given
+        if context is not None:
+            materials = "Use the resume and job description provided above."
+        else:
+            resume_content, job_description = fit_resume_and_job(resume_content, job_description, MAX_PROMPT_TOKENS)
+            materials = f"Resume:\n{resume_content}\n\nJob Description:\n{job_description}"
+        
+        items = [{"id": index, "question": question, "word_limit": word_limits[index]}
+                 for index, question in questions.items()]
+        
+        prompt = f"""
+        You are a professional job application specialist. Your task is to help a candidate create personalized answers to several job application questions.
+        
+        {materials}
+        
+        Position: {position_name} at {company_name}
+        
+        Job Application Questions (JSON; word_limit is null when there is no limit):
+        {json.dumps(items, indent=2)}
+        
+        Write a compelling, specific, and personalized answer to each question that:
+        1. Directly addresses what the question is asking
+        2. Connects relevant experiences from the resume to the job requirements
+        3. Uses specific examples and metrics from the resume when possible
+        4. Aligns with the company's values or requirements from the job description
+        5. Shows enthusiasm for this specific role and company
+        6. Is concise, professional, and conversational in tone
+        7. Avoids generic answers that could apply to any company
+        8. Respects its word limit exactly, if it has one
+        
+        Each answer should sound natural and personal, as if the candidate wrote it themselves.
+        Respond with ONLY a JSON array containing one object per question, in the form
+        [{{"id": <question id>, "answer": "<answer text>"}}]
+        """
+        
+        generation_config = {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            "top_k": 40,
+            "response_mime_type": "application/json"
+        }
+        if context is not None:
+            text = context.generate_text(prompt, generation_config, label="qna.batch")
+        else:
+            text = self.llm.generate_text(prompt, generation_config, label="qna.batch")
+        return self.parse_json_answers(text, questions)
+    
+    @staticmethod
+    def parse_json_answers(text, questions):
+        """Validate a JSON answer array against the questions asked, keeping only well-formed answers"""
+        # Tolerate a markdown code fence around the JSON
+        text = re.sub(r'^\s*```(?:json)?\s*|\s*```\s*$', '', text)
+        try:
+            items = json.loads(text)
+        except ValueError:
+            return {}
+        if isinstance(items, dict):
+            items = items.get('answers', [])
+        if not isinstance(items, list):
+            return {}
+        
+        answers = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index, answer = item.get('id'), item.get('answer')
+            if isinstance(index, str) and index.strip().isdigit():
+                index = int(index)
+            if (isinstance(index, int) and index in questions and index not in answers
+                    and isinstance(answer, str) and answer.strip()):
+                answers[index] = answer.strip()
+        return answers
     
     def ensure_word_limit(self, text, word_limit):
         """Ensure the text respects the word limit"""
@@ -184,6 +431,12 @@ class JobApplicationQnA:
         # Truncate to word limit and add ellipsis
         return " ".join(words[:word_limit])
     
+    @staticmethod
+    def get_scope_key(resume_content, job_description, company_name, position_name):
+        """Identify the job an answer was written for; similar questions are only matched within one job"""
+        data = json.dumps([resume_content, job_description, company_name, position_name])
+        return hashlib.sha256(data.encode()).hexdigest()
+    
     @staticmethod
     def get_cache_key(resume_content, job_description, question, company_name, position_name, word_limit):
         """Generate a unique cache key for the current inputs"""
@@ -1,8 +1,13 @@
 import os
 import re
 import time
-import google.generativeai as genai
 from pathlib import Path
+from ..llm_client import collect_stream, get_llm_client
+from ..prompt_budget import RESUME_KEYWORDS, PromptSection, fit_sections
+
+
+PROMPT_TOKEN_BUDGET = 250  # Resume highlights
+
 
 class LinkedInDMGenerator:
     """Class for generating LinkedIn direct messages to hiring managers"""
@@ -14,6 +19,7 @@ class LinkedInDMGenerator:
         self.responses_path = self.data_path / "responses"
         self.linkedin_path = self.responses_path / "linkedin_dms"
         self.temp_linkedin_dm = None
+        self.llm = get_llm_client()
         
         # Ensure directory exists
         self.linkedin_path.mkdir(parents=True, exist_ok=True)
@@ -39,24 +45,42 @@ class LinkedInDMGenerator:
             print(f"Error creating file: {e}")
             return None
     
-    def generate_linkedin_dm(self, resume_content, job_description, hr_name, company_name, position_name):
-        """Generate a LinkedIn DM to a hiring manager"""
+    def generate_linkedin_dm(self, resume_content, job_description, hr_name, company_name, position_name, context=None):
+        """Generate a LinkedIn DM to a hiring manager (sending only the task prompt if a shared context is given)"""
+        return collect_stream(self.stream_linkedin_dm(resume_content, job_description, hr_name, company_name, position_name, context))
+    
+    def stream_linkedin_dm(self, resume_content, job_description, hr_name, company_name, position_name, context=None):
+        """Like generate_linkedin_dm, yielding the LinkedIn DM so far as it is generated"""
         if not resume_content or not job_description:
-            return "Please provide resume content and job description."
+            yield "Please provide resume content and job description."
+            return
         
         if not company_name or not position_name:
-            return "Please provide both company name and position title."
+            yield "Please provide both company name and position title."
+            return
+        
+        # Unless the context is uploaded once, sending it costs more than the highlights this needs
+        if context is not None and not context.saves_tokens(PROMPT_TOKEN_BUDGET):
+            context = None
         
         # Format HR name (use appropriate default if not provided)
         greeting_name = hr_name.strip() if hr_name and hr_name.strip() else ""
         
+        # The shared context already carries the full resume
+        if context is not None:
+            resume_highlights = "Use the resume and job description provided above."
+        else:
+            # A short DM only needs the highlights of the resume
+            resume_highlights = fit_sections([
+                PromptSection('resume', resume_content, priority=1, keywords=RESUME_KEYWORDS)
+            ], PROMPT_TOKEN_BUDGET)['resume']
+        
         # Generate the LinkedIn DM using Gemini
-        model = genai.GenerativeModel('gemini-2.0-flash')
         prompt = f"""
         Create a brief, professional LinkedIn direct message to a hiring manager or recruiter.
         
         Resume highlights:
-        {resume_content[:800]}  # Using first 800 chars of resume for brevity
+        {resume_highlights}
         
         Job details:
         Position: {position_name}
@@ -74,9 +98,15 @@ class LinkedInDMGenerator:
         """
         
         try:
-            response = model.generate_content(prompt)
-            linkedin_dm = response.text
+            if context is not None:
+                chunks = context.stream_text(prompt, label="linkedin_dm.generate")
+            else:
+                chunks = self.llm.stream_text(prompt, label="linkedin_dm.generate")
+            linkedin_dm = ""
+            for chunk in chunks:
+                linkedin_dm += chunk
+                yield linkedin_dm
             self.temp_linkedin_dm = linkedin_dm
-            return linkedin_dm
+            yield linkedin_dm
         except Exception as e:
-            return f"Error generating LinkedIn DM: {str(e)}"
\ No newline at end of file
+            yield f"Error generating LinkedIn DM: {str(e)}"
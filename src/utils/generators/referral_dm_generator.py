@@ -1,8 +1,9 @@
 import os
 import re
 import time
-import google.generativeai as genai
 from pathlib import Path
+from ..llm_client import collect_stream, get_llm_client
+from ..prompt_budget import MAX_PROMPT_TOKENS, fit_resume_and_job
 
 class ReferralDMGenerator:
     """Class to generate LinkedIn DMs for referral requests"""
@@ -13,7 +14,7 @@ class ReferralDMGenerator:
         self.data_path = self.base_path / "src" /"data"
         self.responses_path = self.data_path / "responses"
         self.referral_path = self.responses_path / "linkedin_dms"
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.llm = get_llm_client()
         self.temp_referral_dm = None
         
         # Ensure directory exists
@@ -42,16 +43,30 @@ class ReferralDMGenerator:
             print(f"Error saving referral message: {e}")
             return None
     
-    def generate_referral_dm(self, resume_content, job_description, referral_name, company_name, position_name):
-        """Generate a LinkedIn DM to request a referral"""
+    def generate_referral_dm(self, resume_content, job_description, referral_name, company_name, position_name, context=None):
+        """Generate a LinkedIn DM to request a referral (sending only the task prompt if a shared context is given)"""
+        return collect_stream(self.stream_referral_dm(resume_content, job_description, referral_name, company_name, position_name, context))
+    
+    def stream_referral_dm(self, resume_content, job_description, referral_name, company_name, position_name, context=None):
+        """Like generate_referral_dm, yielding the referral request so far as it is generated"""
         if not resume_content or not job_description:
-            return "Error: Missing resume or job description."
+            yield "Error: Missing resume or job description."
+            return
         
         if not company_name or not position_name:
-            return "Error: Missing company name or position title."
+            yield "Error: Missing company name or position title."
+            return
         
         if not referral_name:
-            return "Error: Please provide the name of your connection to personalize the message."
+            yield "Error: Please provide the name of your connection to personalize the message."
+            return
+        
+        # The shared context already carries the full resume and job description
+        if context is not None:
+            materials = "Use the resume and job description provided above."
+        else:
+            resume_content, job_description = fit_resume_and_job(resume_content, job_description, MAX_PROMPT_TOKENS)
+            materials = f"RESUME:\n{resume_content}\n\nJOB DESCRIPTION:\n{job_description}"
         
         # Create prompt for the model
         prompt = f"""
@@ -71,22 +86,25 @@ class ReferralDMGenerator:
         8. Be under 300 words (LinkedIn message limit)
         9. Use natural, conversational language that builds rapport
 
-        RESUME:
-        {resume_content}
-
-        JOB DESCRIPTION:
-        {job_description}
+        {materials}
 
         Write only the message content, without any explanations or notes.
         """
 
         try:
-            response = self.model.generate_content(prompt)
-            referral_dm = response.text.strip()
+            if context is not None:
+                chunks = context.stream_text(prompt, label="referral_dm.generate")
+            else:
+                chunks = self.llm.stream_text(prompt, label="referral_dm.generate")
+            referral_dm = ""
+            for chunk in chunks:
+                referral_dm += chunk
+                yield referral_dm
+            referral_dm = referral_dm.strip()
             
             # Store the generated message
             self.temp_referral_dm = referral_dm
             
-            return referral_dm
+            yield referral_dm
         except Exception as e:
-            return f"Error generating referral request: {str(e)}"
\ No newline at end of file
+            yield f"Error generating referral request: {str(e)}"
@@ -3,9 +3,10 @@ import re
 import time
 import subprocess
 import tempfile
-import google.generativeai as genai
 from pathlib import Path
 import gradio as gr
+from ..llm_client import collect_stream, get_llm_client
+from ..prompt_budget import MAX_PROMPT_TOKENS, fit_resume_and_job
 
 class ResumeBuilder:
     """Class for building ATS-friendly resumes using LaTeX templates"""
@@ -22,6 +23,7 @@ class ResumeBuilder:
         
         # Initialize other attributes
         self.temp_latex_content = None
+        self.llm = get_llm_client()
         
         # Ensure templates directory exists
         self.templates_path.mkdir(parents=True, exist_ok=True)
@@ -33,6 +35,14 @@ class ResumeBuilder:
     
     def generate_resume_content(self, resume_content, job_description, sections, user_suggestion, company_name, position_name, template_name):
         """Generate optimized resume content based on the job description"""
+        return collect_stream(self.stream_resume_content(resume_content, job_description, sections, user_suggestion,
+                                                         company_name, position_name, template_name))
+
+    def stream_resume_content(self, resume_content, job_description, sections, user_suggestion, company_name, position_name, template_name):
+        """Like generate_resume_content, yielding the raw LaTeX so far as it is generated.
+
+        The last value yielded is the LaTeX with any markdown code fence removed.
+        """
         self.temp_resume_content = resume_content
 
         # Read the template
@@ -40,6 +50,9 @@ class ResumeBuilder:
         with open(template_path, 'r', encoding='utf-8') as f:
             template_content = f.read()
 
+        resume_excerpt, job_excerpt = fit_resume_and_job(resume_content, job_description, MAX_PROMPT_TOKENS)
+        materials = f"JOB DESCRIPTION:\n{job_excerpt}\n\nUsing my current experience:\n{resume_excerpt}"
+        
         # Prepare the prompt for the AI
         prompt = f"""
         You are an expert resume writer specializing in ATS-friendly LaTeX resumes. Create a highly targeted, one-page resume for:
@@ -47,11 +60,7 @@ class ResumeBuilder:
         POSITION: {position_name}
         COMPANY: {company_name}
         
-        JOB DESCRIPTION:
-        {job_description}
-        
-        Using my current experience:
-        {resume_content}
+        {materials}
         
         Required sections: {', '.join(sections)}
         Suggestions: {user_suggestion if user_suggestion else 'None specified'}
@@ -78,14 +87,11 @@ class ResumeBuilder:
         """
         
         try:
-            # Initialize the Gemini model
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
             # Generate the optimized resume content
-            response = model.generate_content(prompt)
-            
-            # Extract the LaTeX content from the response
-            content = response.text
+            content = ""
+            for chunk in self.llm.stream_text(prompt, label="resume_builder.generate"):
+                content += chunk
+                yield content
             
             # If the response is in markdown code block format, extract just the LaTeX
             if "```latex" in content:
@@ -96,10 +102,10 @@ class ResumeBuilder:
             # Store the LaTeX content for later use
             self.temp_latex_content = content
             
-            return content
+            yield content
             
         except Exception as e:
-            return f"Error generating resume content: {str(e)}"
+            yield f"Error generating resume content: {str(e)}"
     
     def generate_resume_pdf(self, resume_preview, template_name, company_name, position_name):
         """Generate a PDF resume using the LaTeX template and optimized content"""
@@ -177,9 +183,6 @@ class ResumeBuilder:
             return "No LaTeX content available to fix."
         
         try:
-            # Initialize the Gemini model
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
             # Prepare the prompt for the AI
             prompt = f"""
             You are an expert in LaTeX. I have a LaTeX document that is failing to compile with the following error:
@@ -203,10 +206,7 @@ class ResumeBuilder:
             """
             
             # Generate the fixed LaTeX content
-            response = model.generate_content(prompt)
-            
-            # Extract the LaTeX content from the response
-            content = response.text
+            content = self.llm.generate_text(prompt, label="resume_builder.fix_latex")
             
             # If the response is in markdown code block format, extract just the LaTeX
             if "```latex" in content:
@@ -259,9 +259,6 @@ class ResumeBuilder:
             return latex_code
         
         try:
-            # Initialize the Gemini model
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
             # Prepare the prompt for the AI
             prompt = f"""
             You are a LaTeX expert. Modify the following LaTeX resume code according to these suggestions:
@@ -290,10 +287,7 @@ class ResumeBuilder:
             """
             
             # Generate the modified LaTeX content
-            response = model.generate_content(prompt)
-            
-            # Extract the LaTeX content from the response
-            content = response.text
+            content = self.llm.generate_text(prompt, label="resume_builder.suggestions")
             
             # If the response is in markdown code block format, extract just the LaTeX
             if "```latex" in content:
@@ -0,0 +1,218 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+import requests
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:124.0) Gecko/20100101 Firefox/124.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Phrases that mean the server sent a shell page that only renders with JavaScript
+JS_GATE_MARKERS = [
+    'enable javascript',
+    'javascript is disabled',
+    'turn on javascript',
+    'requires javascript',
+    'javascript to run this app',
+    'authwall',
+]
+
+_DROP_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'iframe', 'form', 'nav', 'footer', 'button']
+_BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'aside', 'ul', 'ol', 'table', 'tr',
+    'blockquote', 'pre', 'dl', 'dt', 'dd', 'figure',
+}
+_HEADING_TAGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+
+def _render(node: Tag, out: List[str]) -> None:
+    """Append a rough markdown rendering of node's children to out"""
+    for child in node.children:
+        if isinstance(child, Comment):
+            continue
+        if isinstance(child, NavigableString):
+            text = re.sub(r'\s+', ' ', str(child))
+            if text.strip():
+                out.append(text)
+            continue
+        if not isinstance(child, Tag):
+            continue
+
+        name = child.name
+        if name in _HEADING_TAGS:
+            heading = child.get_text(' ', strip=True)
+            if heading:
+                out.append(f"\n\n{'#' * _HEADING_TAGS[name]} {heading}\n\n")
+        elif name == 'li':
+            out.append("\n- ")
+            _render(child, out)
+            out.append("\n")
+        elif name == 'br':
+            out.append("\n")
+        elif name in ('strong', 'b'):
+            text = child.get_text(' ', strip=True)
+            if text:
+                out.append(f" **{text}** ")
+        elif name in _BLOCK_TAGS:
+            out.append("\n\n")
+            _render(child, out)
+            out.append("\n\n")
+        else:
+            _render(child, out)
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert an HTML document or fragment into readable markdown"""
+    return soup_to_markdown(BeautifulSoup(html, 'html.parser'))
+
+
+def soup_to_markdown(soup: BeautifulSoup) -> str:
+    """Convert a parsed document into readable markdown (drops non-content tags in place)"""
+    for tag in soup(_DROP_TAGS):
+        tag.decompose()
+
+    root = soup.body or soup
+    out: List[str] = []
+    _render(root, out)
+
+    lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in ''.join(out).splitlines()]
+    text = '\n'.join(lines)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def find_job_posting(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    """Return the first schema.org JobPosting object embedded as JSON-LD, if any"""
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+
+        candidates = data if isinstance(data, list) else [data]
+        while candidates:
+            item = candidates.pop(0)
+            if not isinstance(item, dict):
+                continue
+            item_type = item.get('@type')
+            types = item_type if isinstance(item_type, list) else [item_type]
+            if 'JobPosting' in types:
+                return item
+            graph = item.get('@graph')
+            if isinstance(graph, list):
+                candidates.extend(graph)
+    return None
+
+
+def job_posting_to_markdown(posting: Dict[str, Any]) -> str:
+    """Render a JSON-LD JobPosting as markdown in the shape of a crawled page"""
+    parts = []
+    title = posting.get('title')
+    if title:
+        parts.append(f"# {title}")
+
+    organization = posting.get('hiringOrganization')
+    company = organization.get('name') if isinstance(organization, dict) else organization
+    if company:
+        parts.append(f"Company: {company}")
+
+    locations = posting.get('jobLocation')
+    if isinstance(locations, dict):
+        locations = [locations]
+    place_names = []
+    for location in locations or []:
+        address = location.get('address') if isinstance(location, dict) else None
+        if isinstance(address, dict):
+            place = ', '.join(str(address[key]) for key in ('addressLocality', 'addressRegion', 'addressCountry')
+                              if isinstance(address.get(key), str))
+            if place:
+                place_names.append(place)
+    if place_names:
+        parts.append(f"Location: {'; '.join(place_names)}")
+    if posting.get('employmentType'):
+        employment_type = posting['employmentType']
+        if isinstance(employment_type, list):
+            employment_type = ', '.join(employment_type)
+        parts.append(f"Employment Type: {employment_type}")
+
+    description = posting.get('description') or ''
+    if description:
+        parts.append("## Job Description\n\n" + html_to_markdown(description))
+    return '\n\n'.join(parts)
+
+
+class HttpFetcher:
+    """Pooled keep-alive HTTP client that fetches job pages without a browser"""
+
+    def __init__(self, timeout: float = 10, pool_size: int = 10, min_words: int = 150):
+        self.timeout = timeout
+        self.min_words = min_words
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+
+    def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Fetch a page, conditionally if validators are given.
+
+        Returns a dict with 'status', 'html' (empty unless a 200 HTML page), 'etag' and
+        'last_modified', or None if the request fails.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {str(e)}")
+            return None
+
+        result = {
+            'status': response.status_code,
+            'html': '',
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code == 200 and 'html' in content_type.lower():
+            result['html'] = response.text
+        return result
+
+    def soup_to_job_markdown(self, soup: BeautifulSoup) -> Optional[str]:
+        """Convert a parsed page to markdown, or None if it is too thin or JS-gated (drops non-content tags in place)"""
+        # Structured data is the most reliable source when the page provides it
+        posting = find_job_posting(soup)
+        if posting and posting.get('description'):
+            content = job_posting_to_markdown(posting)
+            if self._is_usable(content):
+                return content
+
+        content = soup_to_markdown(soup)
+        if not self._is_usable(content):
+            return None
+        return content
+
+    def _is_usable(self, content: str) -> bool:
+        """Check the content is long enough and not a JavaScript placeholder"""
+        word_count = len(content.split())
+        if word_count < self.min_words:
+            return False
+        # A full posting may mention JavaScript in passing; only distrust shorter pages
+        if word_count < 3 * self.min_words:
+            lowered = content.lower()
+            return not any(marker in lowered for marker in JS_GATE_MARKERS)
+        return True
+
+    def close(self) -> None:
+        self.session.close()
@@ -1,9 +1,9 @@
-import google.generativeai as genai
 from typing import Dict
+from .llm_client import get_llm_client
 
 class JobDetailsExtractor:
     def __init__(self):
-        self.model_name = 'gemini-2.0-flash'
+        self.llm = get_llm_client()
         
     def extract_from_text(self, text: str) -> Dict[str, str]:
         """Extract job details from text using AI"""
@@ -28,21 +28,12 @@ class JobDetailsExtractor:
         """
 
         try:
-            # Initialize Gemini model
-            model = genai.GenerativeModel(
-                self.model_name,
-                generation_config={
-                    "temperature": 0.1,  # Lower temperature for more focused extraction
-                    "top_p": 0.9,
-                    "top_k": 40
-                }
-            )
-
             # Generate the extraction
-            response = model.generate_content(prompt)
-            
-            # Parse the response
-            response_text = response.text.strip()
+            response_text = self.llm.generate_text(prompt, generation_config={
+                "temperature": 0.1,  # Lower temperature for more focused extraction
+                "top_p": 0.9,
+                "top_k": 40
+            }, label="job_extractor.extract").strip()
             
             # Extract company and position using string parsing
             company = "Unknown"
@@ -0,0 +1,241 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from .metrics import get_metrics, split_label
+from .rate_limiter import backoff_delay
+from .single_flight import SingleFlight, request_key
+
+
+# Settings shared by every generator
+DEFAULT_MODEL = 'gemini-2.0-flash'
+DEFAULT_TIMEOUT = 60  # Seconds per request
+DEFAULT_MAX_RETRIES = 2  # Extra attempts after a transient failure
+DEFAULT_RETRY_DELAY = 1  # Base delay for exponential backoff between attempts
+DEFAULT_MAX_RETRY_DELAY = 20
+DEFAULT_MAX_CONCURRENT = 4  # Simultaneous requests across the whole app
+
+# Errors worth retrying: rate limits, overload and timeouts
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+
+class LLMClient:
+    """Shared Gemini client: cached model instances, timeouts, retries and a concurrency cap.
+
+    Models are created once per (model name, generation config) and reused, so their
+    underlying transport and connections are reused too. Identical requests made while one
+    is already in flight (a double click, two tabs) wait for it and share its response.
+
+    Every request can carry a label ("generator.operation"); its wall time, time to first
+    token, token usage and retries are recorded under that label in the metrics registry.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, timeout: float = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, retry_delay: float = DEFAULT_RETRY_DELAY,
+                 max_retry_delay: float = DEFAULT_MAX_RETRY_DELAY, max_concurrent: int = DEFAULT_MAX_CONCURRENT):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._models: Dict[Tuple[str, str], genai.GenerativeModel] = {}
+        self._models_lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._flights = SingleFlight()
+
+    def model(self, model_name: Optional[str] = None, generation_config: Optional[Dict[str, Any]] = None,
+              cached_content: Any = None) -> genai.GenerativeModel:
+        """Return the cached model for this name and generation config, creating it on first use.
+
+        With cached_content (a Gemini CachedContent), the model is bound to that cached prefix
+        and model_name is ignored.
+        """
+        config_key = json.dumps(generation_config or {}, sort_keys=True)
+        if cached_content is not None:
+            key = ('cached:' + cached_content.name, config_key)
+        else:
+            model_name = model_name or self.model_name
+            key = (model_name, config_key)
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is None:
+                if cached_content is not None:
+                    model = genai.GenerativeModel.from_cached_content(
+                        cached_content, generation_config=generation_config
+                    )
+                else:
+                    model = genai.GenerativeModel(model_name, generation_config=generation_config)
+                self._models[key] = model
+            return model
+
+    def forget_cached_content(self, cached_content: Any) -> None:
+        """Drop models bound to a cached prefix that is being deleted"""
+        prefix = 'cached:' + cached_content.name
+        with self._models_lock:
+            for key in [key for key in self._models if key[0] == prefix]:
+                del self._models[key]
+
+    def generate(self, prompt: Any, generation_config: Optional[Dict[str, Any]] = None,
+                 model_name: Optional[str] = None, cached_content: Any = None, label: Optional[str] = None,
+                 **kwargs: Any) -> Any:
+        """Call generate_content with the shared timeout, retry and concurrency settings.
+
+        Extra keyword arguments are passed through to generate_content. Non-transient
+        errors, and transient ones once retries are exhausted, are raised to the caller.
+        Streamed responses (stream=True) can only be read once, so they are never shared, and
+        only their first chunk counts against the concurrency cap; use stream_text, which
+        identical requests can share and which holds its slot until the stream ends.
+        """
+        if kwargs.get('stream'):
+            return self._generate(prompt, generation_config, model_name, cached_content, label, **kwargs)
+        key = self._request_key(prompt, generation_config, model_name, cached_content, kwargs)
+        return self._flights.do(key, self._generate, prompt, generation_config, model_name, cached_content,
+                                label, **kwargs)
+
+    def _generate(self, prompt: Any, generation_config: Optional[Dict[str, Any]] = None,
+                  model_name: Optional[str] = None, cached_content: Any = None, label: Optional[str] = None,
+                  **kwargs: Any) -> Any:
+        start = time.monotonic()
+        retries = [0]
+        response = None
+        try:
+            response = self._request(prompt, generation_config, model_name, cached_content, retries, **kwargs)
+            return response
+        finally:
+            # A streamed response is only timed up to its first chunk; stream_text measures whole streams
+            get_metrics().record_call(*split_label(label), time.monotonic() - start,
+                                      usage=getattr(response, 'usage_metadata', None), retries=retries[0],
+                                      error=response is None)
+
+    def _request(self, prompt: Any, generation_config: Optional[Dict[str, Any]], model_name: Optional[str],
+                 cached_content: Any, retries: list, hold_slot: bool = False, **kwargs: Any) -> Any:
+        """Make the request, retrying transient failures; retries[0] counts the retries made.
+
+        The request holds one of the concurrency slots while it runs. With hold_slot, the slot is
+        still held when the response is returned, and the caller must release it with
+        _release_slot() once it has finished reading the response (e.g. a stream).
+        """
+        model = self.model(model_name, generation_config, cached_content)
+        request_options = dict(kwargs.pop('request_options', None) or {})
+        request_options.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            self._semaphore.acquire()
+            try:
+                response = model.generate_content(prompt, request_options=request_options, **kwargs)
+            except BaseException as e:
+                self._semaphore.release()
+                if not isinstance(e, RETRYABLE_ERRORS) or attempt >= self.max_retries:
+                    raise
+                retries[0] += 1
+                delay = backoff_delay(attempt, self.retry_delay, self.max_retry_delay)
+                print(f"LLM request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                if not hold_slot:
+                    self._semaphore.release()
+                return response
+
+    def _release_slot(self) -> None:
+        self._semaphore.release()
+
+    def generate_text(self, prompt: Any, generation_config: Optional[Dict[str, Any]] = None,
+                      model_name: Optional[str] = None, cached_content: Any = None, **kwargs: Any) -> str:
+        """Like generate, returning the response text"""
+        return self.generate(prompt, generation_config, model_name, cached_content, **kwargs).text
+
+    def stream_text(self, prompt: Any, generation_config: Optional[Dict[str, Any]] = None,
+                    model_name: Optional[str] = None, cached_content: Any = None, label: Optional[str] = None,
+                    **kwargs: Any) -> Iterator[str]:
+        """Like generate_text, yielding text chunks as they arrive.
+
+        Only the initial request is retried; an error part-way through the stream is raised.
+        A caller making the same request while it is streaming gets the same text, from the start.
+        """
+        key = self._request_key(prompt, generation_config, model_name, cached_content, dict(kwargs, stream=True))
+        return self._flights.stream(key, lambda: self._stream_text(
+            prompt, generation_config, model_name, cached_content, label, **kwargs
+        ))
+
+    def _stream_text(self, prompt: Any, generation_config: Optional[Dict[str, Any]], model_name: Optional[str],
+                     cached_content: Any, label: Optional[str], **kwargs: Any) -> Iterator[str]:
+        """Stream the response text, recording the whole stream's timings and usage once it ends"""
+        start = time.monotonic()
+        retries = [0]
+        first_token = None
+        usage = None
+        error = False
+        try:
+            # generate_content returns once the stream has started; the rest arrives as it is read,
+            # so the concurrency slot is held until the stream is exhausted or closed
+            response = self._request(prompt, generation_config, model_name, cached_content, retries,
+                                     hold_slot=True, stream=True, **kwargs)
+            try:
+                for chunk in response:
+                    # Each chunk carries the usage so far; the last one has the totals
+                    usage = getattr(chunk, 'usage_metadata', None) or usage
+                    for text in iter_text([chunk]):
+                        if first_token is None:
+                            first_token = time.monotonic() - start
+                        yield text
+            finally:
+                self._release_slot()
+        except Exception:
+            error = True
+            raise
+        finally:
+            get_metrics().record_call(*split_label(label), time.monotonic() - start, ttft=first_token,
+                                      usage=usage, retries=retries[0], error=error)
+
+    def _request_key(self, prompt: Any, generation_config: Optional[Dict[str, Any]], model_name: Optional[str],
+                     cached_content: Any, kwargs: Dict[str, Any]) -> str:
+        """Key identical requests alike, so concurrent duplicates can share one call"""
+        return request_key(
+            model_name or self.model_name,
+            cached_content.name if cached_content is not None else None,
+            generation_config,
+            prompt,
+            kwargs,
+        )
+
+
+def iter_text(response: Iterable[Any]) -> Iterator[str]:
+    """Yield the text of each chunk of a streamed response"""
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks carrying only metadata (finish reason, safety ratings) have no text
+            continue
+        if text:
+            yield text
+
+
+def collect_stream(partials: Iterable[str], default: str = "") -> str:
+    """Exhaust a stream of growing partial results and return the last, complete one"""
+    result = default
+    for result in partials:
+        pass
+    return result
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
@@ -0,0 +1,238 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+METRICS_DIR = Path(__file__).resolve().parent.parent / "data" / "metrics"
+DUMP_INTERVAL = 60  # Seconds between metrics.json / metrics.prom dumps
+SAMPLE_SIZE = 1000  # Latest latency samples kept per operation for percentiles
+QUANTILES = (0.5, 0.95)
+
+
+def percentile(samples: List[float], quantile: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(quantile * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def split_label(label: Optional[str]) -> Tuple[str, str]:
+    """Split a 'generator.operation' label; unlabelled calls are reported as other.generate"""
+    generator, _, operation = (label or 'other').partition('.')
+    return generator, operation or 'generate'
+
+
+def usage_counts(usage: Any) -> Dict[str, int]:
+    """Token counts from a Gemini response's usage_metadata"""
+    return {
+        'prompt': getattr(usage, 'prompt_token_count', 0) or 0,
+        'output': getattr(usage, 'candidates_token_count', 0) or 0,
+        'cached': getattr(usage, 'cached_content_token_count', 0) or 0,
+    }
+
+
+class OperationStats:
+    """Everything recorded for one (generator, operation)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.tokens = {'prompt': 0, 'output': 0, 'cached': 0}
+        self.wall_seconds = 0.0
+        self.ttft_seconds = 0.0
+        self.ttft_count = 0
+        self.wall_samples: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self.ttft_samples: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        summary = {
+            'calls': self.calls,
+            'errors': self.errors,
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hits / lookups if lookups else None,
+            'prompt_tokens': self.tokens['prompt'],
+            'output_tokens': self.tokens['output'],
+            'cached_tokens': self.tokens['cached'],
+            'wall_seconds_total': self.wall_seconds,
+        }
+        for name, samples in (('wall', self.wall_samples), ('ttft', self.ttft_samples)):
+            for quantile in QUANTILES:
+                value = percentile(list(samples), quantile) if samples else None
+                summary[f'{name}_p{int(quantile * 100)}'] = value
+        return summary
+
+
+class MetricsRegistry:
+    """Process-wide record of model calls and cache lookups, per generator and operation.
+
+    Exported as JSON (snapshot), Prometheus text exposition format (prometheus_text), or
+    both written to disk periodically (start_periodic_dump).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._started_at = time.time()
+        self._dump_thread: Optional[threading.Thread] = None
+        self._stop_dumping = threading.Event()
+
+    def _get(self, generator: str, operation: str) -> OperationStats:
+        stats = self._stats.get((generator, operation))
+        if stats is None:
+            stats = self._stats[(generator, operation)] = OperationStats()
+        return stats
+
+    def record_call(self, generator: str, operation: str, wall_time: float, ttft: Optional[float] = None,
+                    usage: Any = None, retries: int = 0, error: bool = False) -> None:
+        """Record one model call (or other timed operation, such as a crawl)"""
+        tokens = usage_counts(usage) if usage is not None else None
+        with self._lock:
+            stats = self._get(generator, operation)
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.retries += retries
+            stats.wall_seconds += wall_time
+            stats.wall_samples.append(wall_time)
+            if ttft is not None:
+                stats.ttft_seconds += ttft
+                stats.ttft_count += 1
+                stats.ttft_samples.append(ttft)
+            if tokens:
+                for kind, count in tokens.items():
+                    stats.tokens[kind] += count
+
+    def record_cache(self, generator: str, operation: str, hit: bool) -> None:
+        """Record one cache lookup"""
+        with self._lock:
+            stats = self._get(generator, operation)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dict"""
+        with self._lock:
+            operations = [dict(generator=generator, operation=operation, **stats.summary())
+                          for (generator, operation), stats in sorted(self._stats.items())]
+        return {'started_at': self._started_at, 'generated_at': time.time(), 'operations': operations}
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+
+            def family(name: str, kind: str, help_text: str, samples: List[Tuple[str, Dict[str, Any], float]]) -> None:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for suffix, labels, value in samples:
+                    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+                    lines.append(f"{name}{suffix}{{{label_text}}} {value}")
+
+            def labels(generator: str, operation: str, **extra: Any) -> Dict[str, Any]:
+                return dict(generator=generator, operation=operation, **extra)
+
+            family("applicator_calls_total", "counter", "Model calls and other timed operations.",
+                   [("", labels(*key), stats.calls) for key, stats in items if stats.calls])
+            family("applicator_errors_total", "counter", "Calls that failed.",
+                   [("", labels(*key), stats.errors) for key, stats in items if stats.calls])
+            family("applicator_retries_total", "counter", "Retried model requests.",
+                   [("", labels(*key), stats.retries) for key, stats in items if stats.calls])
+            family("applicator_tokens_total", "counter", "Tokens reported by the model's usage metadata.",
+                   [("", labels(*key, type=kind), count)
+                    for key, stats in items if stats.calls for kind, count in stats.tokens.items()])
+            family("applicator_cache_lookups_total", "counter", "Cache lookups by result.",
+                   [("", labels(*key, result=result), count) for key, stats in items
+                    if stats.cache_hits or stats.cache_misses
+                    for result, count in (("hit", stats.cache_hits), ("miss", stats.cache_misses))])
+
+            for name, help_text, attribute, total, count in (
+                ("applicator_call_duration_seconds", "Wall time per call.", 'wall_samples',
+                 'wall_seconds', 'calls'),
+                ("applicator_time_to_first_token_seconds", "Time to the first streamed token.", 'ttft_samples',
+                 'ttft_seconds', 'ttft_count'),
+            ):
+                samples = []
+                for key, stats in items:
+                    if not getattr(stats, count):
+                        continue
+                    recent = list(getattr(stats, attribute))
+                    samples.extend(("", labels(*key, quantile=quantile), percentile(recent, quantile))
+                                   for quantile in QUANTILES)
+                    samples.append(("_sum", labels(*key), getattr(stats, total)))
+                    samples.append(("_count", labels(*key), getattr(stats, count)))
+                family(name, "summary", help_text, samples)
+
+        return "\n".join(lines) + "\n"
+
+    def summary_rows(self) -> List[List[Any]]:
+        """One row per generator and operation, for display"""
+        def seconds(value: Optional[float]) -> str:
+            return f"{value:.2f}" if value is not None else "-"
+
+        rows = []
+        for entry in self.snapshot()['operations']:
+            hit_rate = entry['cache_hit_rate']
+            rows.append([
+                entry['generator'], entry['operation'], entry['calls'], entry['errors'], entry['retries'],
+                seconds(entry['wall_p50']), seconds(entry['wall_p95']),
+                seconds(entry['ttft_p50']), seconds(entry['ttft_p95']),
+                entry['prompt_tokens'], entry['output_tokens'], entry['cached_tokens'],
+                entry['cache_hits'], entry['cache_misses'],
+                f"{hit_rate:.0%}" if hit_rate is not None else "-",
+            ])
+        return rows
+
+    def dump(self, directory: Path = METRICS_DIR) -> None:
+        """Write metrics.json and metrics.prom (for a node_exporter textfile collector) into directory"""
+        directory = Path(directory)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            for name, content in (("metrics.json", json.dumps(self.snapshot(), indent=2)),
+                                  ("metrics.prom", self.prometheus_text())):
+                path = directory / name
+                tmp_path = path.with_name(f"{name}.{os.getpid()}.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing metrics: {str(e)}")
+
+    def start_periodic_dump(self, directory: Path = METRICS_DIR, interval: float = DUMP_INTERVAL) -> None:
+        """Dump the metrics every interval seconds on a background thread, and once more at exit"""
+        with self._lock:
+            if self._dump_thread is not None:
+                return
+            self._dump_thread = threading.Thread(target=self._dump_loop, args=(directory, interval),
+                                                 name="MetricsDump", daemon=True)
+        self._dump_thread.start()
+        atexit.register(self.stop_periodic_dump, directory)
+
+    def stop_periodic_dump(self, directory: Path = METRICS_DIR) -> None:
+        self._stop_dumping.set()
+        self.dump(directory)
+
+    def _dump_loop(self, directory: Path, interval: float) -> None:
+        while not self._stop_dumping.wait(interval):
+            self.dump(directory)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry"""
+    return _metrics
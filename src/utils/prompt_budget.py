@@ -0,0 +1,194 @@
+import math
+import re
+import time
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from .llm_client import get_llm_client
+from .metrics import get_metrics
+from .section_classifier import BOILERPLATE_LABELS, SECTION_KEYWORDS, drop_sections
+
+
+# Token budget for the variable parts of a prompt (resume, job description, history). The
+# instructions around them are short and fixed, so they are not counted against it.
+MAX_PROMPT_TOKENS = 8000
+CHARS_PER_TOKEN = 4  # Rough average for English prose with Gemini's tokenizer
+# Below this share of the budget the local estimate is trusted; above it, exact counts are fetched
+EXACT_COUNT_THRESHOLD = 0.8
+# Paragraphs are only cut part-way if at least this much room is left for them
+MIN_CUT_CHARS = 100
+# After a failed exact count, estimates are used for this many seconds instead of calling again
+COUNT_FAILURE_BACKOFF = 60
+
+# Paragraphs mentioning these are kept ahead of the rest when a section has to be trimmed
+RESUME_KEYWORDS = ('experience', 'education', 'skills', 'projects', 'publications')
+JOB_KEYWORDS = SECTION_KEYWORDS['description'] + SECTION_KEYWORDS['responsibilities'] + SECTION_KEYWORDS['requirements']
+
+_PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+
+_count_failed_at: Optional[float] = None
+
+
+class PromptSection(NamedTuple):
+    """A variable part of a prompt and how it may be trimmed"""
+    name: str
+    text: str
+    priority: int  # Lower-priority sections are trimmed first
+    min_tokens: int = 0  # Never trimmed below this
+    keywords: Tuple[str, ...] = ()
+    keep: str = 'head'  # 'head' keeps the start of the text, 'tail' the end (e.g. conversation history)
+    # Heading-delimited sections with only these labels (see section_classifier) are dropped before trimming
+    drop_labels: FrozenSet[str] = frozenset()
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast local token estimate"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@lru_cache(maxsize=256)
+def _exact_token_count(text: str, model_name: Optional[str]) -> int:
+    llm = get_llm_client()
+    start = time.monotonic()
+    error = True
+    try:
+        total = llm.model(model_name).count_tokens(text, request_options={'timeout': llm.timeout}).total_tokens
+        error = False
+        return total
+    finally:
+        get_metrics().record_call("prompt_budget", "count_tokens", time.monotonic() - start, error=error)
+
+
+def count_tokens(text: str, model_name: Optional[str] = None) -> int:
+    """Exact token count from the API, cached per text; falls back to the estimate if the call fails.
+
+    After a failure the estimate is used without calling the API for COUNT_FAILURE_BACKOFF seconds.
+    """
+    global _count_failed_at
+    if not text:
+        return 0
+    if _count_failed_at is not None and time.monotonic() - _count_failed_at < COUNT_FAILURE_BACKOFF:
+        return estimate_tokens(text)
+    try:
+        return _exact_token_count(text, model_name)
+    except Exception as e:
+        _count_failed_at = time.monotonic()
+        print(f"Token counting failed, using estimates for {COUNT_FAILURE_BACKOFF}s: {str(e)}")
+        return estimate_tokens(text)
+
+
+def _cut(text: str, max_chars: int, keep: str) -> str:
+    """Cut text to max_chars, keeping whole lines from the kept end; a single long line is cut at a word"""
+    lines = text.split('\n')
+    if keep == 'tail':
+        lines.reverse()
+    kept = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    # Don't leave a heading or bullet marker without its text
+    while kept and not kept[-1].strip(' *-•#'):
+        kept.pop()
+    if kept:
+        if keep == 'tail':
+            kept.reverse()
+        return '\n'.join(kept)
+
+    if keep == 'tail':
+        cut = text[-max_chars:]
+        return cut[cut.find(' ') + 1:] if ' ' in cut else cut
+    cut = text[:max_chars]
+    return cut[:cut.rfind(' ')] if ' ' in cut else cut
+
+
+def trim_text(text: str, max_tokens: int, keywords: Iterable[str] = (), keep: str = 'head',
+              chars_per_token: float = CHARS_PER_TOKEN) -> str:
+    """Shorten text to about max_tokens, dropping whole paragraphs where possible.
+
+    The paragraph at the kept end (the header, or the latest message with keep='tail') is always
+    kept. Then paragraphs mentioning any keyword are kept ahead of the others, then paragraphs
+    nearest the kept end; a paragraph that doesn't fit is cut at a line boundary. The paragraphs
+    kept stay in their original order.
+    """
+    max_chars = int(max_tokens * chars_per_token)
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return ""
+
+    paragraphs = _PARAGRAPH_SPLIT.split(text)
+    order = list(range(len(paragraphs)))
+    if keep == 'tail':
+        order.reverse()
+    first, rest = order[0], order[1:]
+    keywords = tuple(keyword.lower() for keyword in keywords)
+    if keywords:
+        rest.sort(key=lambda i: not any(keyword in paragraphs[i].lower() for keyword in keywords))
+
+    chosen = {}
+    used = 0
+    for i in [first] + rest:
+        remaining = max_chars - used
+        if len(paragraphs[i]) + 2 <= remaining:
+            chosen[i] = paragraphs[i]
+            used += len(paragraphs[i]) + 2
+        elif remaining > MIN_CUT_CHARS or not chosen:
+            # Keep as many whole lines of it as fit, then try the (possibly shorter) paragraphs after it
+            cut = _cut(paragraphs[i], remaining - 2, keep)
+            if cut:
+                chosen[i] = cut
+                used += len(cut) + 2
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
+
+
+def fit_sections(sections: Sequence[PromptSection], budget: int = MAX_PROMPT_TOKENS,
+                 exact: bool = True) -> Dict[str, str]:
+    """Trim sections so their total fits the token budget, returning the text for each section name.
+
+    Sizes come from the local estimate; when the total gets close to the budget (and exact is set)
+    the sections are counted exactly in a single request, and the estimates scaled to match. The
+    lowest-priority sections are trimmed first, each down to its min_tokens at most.
+    """
+    sizes = {section.name: estimate_tokens(section.text) for section in sections}
+    estimated_total = sum(sizes.values())
+    if exact and estimated_total > budget * EXACT_COUNT_THRESHOLD:
+        scale = count_tokens("\n\n".join(section.text for section in sections)) / estimated_total
+        sizes = {name: math.ceil(size * scale) for name, size in sizes.items()}
+
+    texts = {section.name: section.text for section in sections}
+    excess = sum(sizes.values()) - budget
+    for section in sorted(sections, key=lambda section: section.priority):
+        if excess <= 0:
+            break
+        size = sizes[section.name]
+        target = max(section.min_tokens, size - excess)
+        if target >= size:
+            continue
+        # Convert the token target to characters using this section's own ratio
+        chars_per_token = len(section.text) / size
+        text = drop_sections(section.text, section.drop_labels) if section.drop_labels else section.text
+        if len(text) <= target * chars_per_token:
+            texts[section.name] = text
+            excess -= size - math.ceil(len(text) / chars_per_token)
+            continue
+        texts[section.name] = trim_text(text, target, section.keywords, section.keep, chars_per_token)
+        excess -= size - target
+    return texts
+
+
+def fit_resume_and_job(resume_content: str, job_description: str,
+                       budget: int = MAX_PROMPT_TOKENS) -> Tuple[str, str]:
+    """Fit a resume and job description into budget, trimming the job description first.
+
+    Benefits and EEO sections of the job description go before anything else is cut. The resume
+    keeps at least half of the budget and the job description a quarter.
+    """
+    texts = fit_sections([
+        PromptSection('resume', resume_content or "", priority=2, min_tokens=budget // 2, keywords=RESUME_KEYWORDS),
+        PromptSection('job_description', job_description or "", priority=1, min_tokens=budget // 4,
+                      keywords=JOB_KEYWORDS, drop_labels=BOILERPLATE_LABELS),
+    ], budget)
+    return texts['resume'], texts['job_description']
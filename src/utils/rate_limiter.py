@@ -0,0 +1,94 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Deque, Dict
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with jitter: roughly base * 2^attempt, randomized by ±50%"""
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class DomainRateLimiter:
+    """One token bucket per domain, created on first use"""
+
+    def __init__(self, rate: float = 2.0, capacity: float = 4.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, domain: str) -> None:
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = self._buckets[domain] = TokenBucket(self.rate, self.capacity)
+        await bucket.acquire()
+
+
+class CircuitBreaker:
+    """Per-domain circuit breaker that opens after repeated blocks.
+
+    The breaker opens once `failure_threshold` blocks land within `failure_window` seconds;
+    older blocks are forgotten, as is the whole count after a success. While open, requests
+    to the domain should fail fast. After `cooldown` seconds the breaker lets a single trial
+    request through (half-open); success closes it again, another failure re-opens it for a
+    full cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 300, failure_window: float = 600):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failure_window = failure_window
+        self._failures: Dict[str, Deque[float]] = {}
+        self._opened_at: Dict[str, float] = {}
+
+    def is_open(self, domain: str) -> bool:
+        """Return True if requests to the domain should currently be skipped"""
+        opened_at = self._opened_at.get(domain)
+        if opened_at is None:
+            return False
+        if time.monotonic() - opened_at >= self.cooldown:
+            # Half-open: allow one trial, and re-arm the timer so concurrent callers still wait
+            self._opened_at[domain] = time.monotonic()
+            return False
+        return True
+
+    def record_success(self, domain: str) -> None:
+        self._failures.pop(domain, None)
+        self._opened_at.pop(domain, None)
+
+    def record_failure(self, domain: str) -> None:
+        now = time.monotonic()
+        failures = self._failures.setdefault(domain, deque())
+        failures.append(now)
+        while failures and now - failures[0] > self.failure_window:
+            failures.popleft()
+        if len(failures) >= self.failure_threshold:
+            if domain not in self._opened_at:
+                print(f"Circuit opened for {domain} after {len(failures)} blocked requests")
+            self._opened_at[domain] = now
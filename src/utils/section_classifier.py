@@ -0,0 +1,73 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Tuple
+
+
+# Keywords that identify each kind of section. The labels marked as kept in KEPT_LABELS
+# reproduce exactly the keyword list clean_job_description has always filtered on.
+SECTION_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    'metadata': ('job title', 'company', 'location', 'jobs-details'),
+    'description': ('job description', 'about the role', 'about the position', 'overview', 'position summary'),
+    'responsibilities': ('responsibilities', 'what you\'ll do'),
+    'requirements': ('requirements', 'qualifications', 'what we\'re looking for'),
+    'about': ('about us', 'about the company'),
+    'benefits': ('benefits', 'perks', 'what we offer', 'compensation'),
+    'eeo': ('equal opportunity', 'equal employment opportunity', 'affirmative action', 'without regard to'),
+}
+
+# Sections with any of these labels are kept when cleaning a job description
+KEPT_LABELS = frozenset({'metadata', 'description', 'responsibilities', 'requirements', 'about'})
+# Sections that say nothing about the role itself; the first to go when a prompt is over budget
+BOILERPLATE_LABELS = frozenset({'benefits', 'eeo'})
+
+_LABEL_FOR_KEYWORD = {keyword: label for label, keywords in SECTION_KEYWORDS.items() for keyword in keywords}
+
+# One pass over the text finds every keyword: the lookahead is zero-width, so a match is tried
+# at every position and overlapping keywords are all reported. Longest alternatives come first,
+# so where two keywords start at the same position the longer one is reported. No keyword of an
+# unkept label starts with a kept keyword, so this never hides a kept match.
+_KEYWORD_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in sorted(_LABEL_FOR_KEYWORD, key=len, reverse=True)) + '))'
+)
+
+_HEADING_SPLIT = re.compile(r'\n#{1,3} ')
+
+
+class ClassifiedSection(NamedTuple):
+    """A section of a job posting and the labels its keywords matched"""
+    index: int
+    text: str
+    labels: FrozenSet[str]
+
+    @property
+    def keep(self) -> bool:
+        """Whether clean_job_description keeps this section (the first section is always kept)"""
+        return self.index == 0 or bool(self.labels & KEPT_LABELS)
+
+
+def classify_text(text: str) -> FrozenSet[str]:
+    """Return the labels of every keyword found in text"""
+    return frozenset(_LABEL_FOR_KEYWORD[match.group(1)] for match in _KEYWORD_PATTERN.finditer(text.lower()))
+
+
+@lru_cache(maxsize=32)
+def classify_sections(content: str) -> Tuple[ClassifiedSection, ...]:
+    """Split content on markdown headings and label each section once"""
+    return tuple(ClassifiedSection(index, section, classify_text(section))
+                 for index, section in enumerate(_HEADING_SPLIT.split(content)))
+
+
+def drop_sections(content: str, labels: Iterable[str]) -> str:
+    """Remove the sections labelled only with the given labels, leaving the rest of content untouched.
+
+    The first section and unlabelled sections are always kept, as are sections that also carry
+    another label (e.g. requirements that mention compensation).
+    """
+    dropped = frozenset(labels)
+    sections = classify_sections(content)
+    separators = _HEADING_SPLIT.findall(content)
+    kept = [sections[0].text]
+    for section, separator in zip(sections[1:], separators):
+        if not section.labels or not section.labels <= dropped:
+            kept.append(separator + section.text)
+    return ''.join(kept)
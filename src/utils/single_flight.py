@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+def request_key(*parts: Any) -> str:
+    """Stable key for a request made of JSON-like parts; other objects are keyed by their repr"""
+    data = json.dumps(parts, sort_keys=True, default=repr)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class _SharedIterator:
+    """An iterator that several consumers can read from, each seeing every item.
+
+    Items are buffered as they are produced. Whichever consumer needs the next item pulls it
+    from the source, so the others keep going if the first one stops reading. consumers is
+    maintained by SingleFlight, which abandons the iterator once the last one stops.
+    """
+
+    def __init__(self, factory: Callable[[], Iterable[T]], on_done: Callable[[], None]):
+        self._factory = factory
+        self._on_done = on_done
+        self._source: Optional[Iterator[T]] = None
+        self._items: List[T] = []
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._pulling = False
+        self._condition = threading.Condition()
+        self.consumers = 0
+
+    def __iter__(self) -> Iterator[T]:
+        position = 0
+        while True:
+            pull = False
+            with self._condition:
+                while position >= len(self._items) and not self._done and self._pulling:
+                    self._condition.wait()
+                if position < len(self._items):
+                    item = self._items[position]
+                    position += 1
+                elif self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                else:
+                    self._pulling = pull = True
+            if pull:
+                self._pull()
+            else:
+                yield item
+
+    def _pull(self) -> None:
+        """Fetch the next item from the source (called by one consumer at a time)"""
+        try:
+            if self._source is None:
+                self._source = iter(self._factory())
+            item = next(self._source)
+        except StopIteration:
+            self._finish()
+        except BaseException as e:
+            self._finish(e)
+        else:
+            with self._condition:
+                self._items.append(item)
+                self._pulling = False
+                self._condition.notify_all()
+
+    def abandon(self) -> None:
+        """Close the source early (releasing whatever it holds), once nobody is reading any more"""
+        with self._condition:
+            if self._done:
+                return
+            source = self._source
+        if source is not None and hasattr(source, 'close'):
+            source.close()
+        self._finish()
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        self._on_done()
+        with self._condition:
+            self._done = True
+            self._error = error
+            self._pulling = False
+            self._condition.notify_all()
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls: callers with the same key share one execution.
+
+    Only calls that overlap in time are shared; once a call finishes, the next caller with
+    its key starts a new one (caching finished results is left to the caches).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._streams: Dict[Hashable, _SharedIterator] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs), or wait for the identical call already running, and return its result.
+
+        An exception raised by the shared call is raised to every caller waiting on it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stream(self, key: Hashable, factory: Callable[[], Iterable[T]]) -> Iterator[T]:
+        """Iterate over factory(), or join the identical stream already running and replay it from the start.
+
+        factory is only called once the first item is wanted. If every caller stops reading before
+        the end, the stream is closed.
+        """
+        with self._lock:
+            shared = self._streams.get(key)
+            if shared is None:
+                shared = self._streams[key] = _SharedIterator(factory, lambda: self._forget_stream(key, shared))
+            shared.consumers += 1
+        return self._consume(key, shared)
+
+    def _consume(self, key: Hashable, shared: _SharedIterator) -> Iterator[T]:
+        try:
+            yield from shared
+        finally:
+            with self._lock:
+                shared.consumers -= 1
+                # Forget it in the same step, so no new caller can join a stream about to be closed
+                abandoned = shared.consumers == 0 and self._streams.get(key) is shared
+                if abandoned:
+                    del self._streams[key]
+            if abandoned:
+                shared.abandon()
+
+    def _forget_stream(self, key: Hashable, shared: _SharedIterator) -> None:
+        with self._lock:
+            if self._streams.get(key) is shared:
+                del self._streams[key]
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Future[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop.
+
+    Cancelling one waiter doesn't cancel the shared call; it is cancelled only when every
+    waiter has been cancelled.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await factory(), or the identical call already running, and return its result"""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(factory()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _AsyncCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
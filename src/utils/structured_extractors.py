@@ -0,0 +1,137 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from .http_fetcher import find_job_posting
+
+
+# Fields every extractor may fill in; company and position match JobDetailsExtractor. They are
+# stored in the crawl cache index, so only short fields belong here: the description itself is
+# the cached page content.
+DETAIL_FIELDS = ('company', 'position', 'location')
+
+Extractor = Callable[[str, BeautifulSoup], Dict[str, str]]
+
+# (domains, extractor) pairs; an empty domain tuple means the extractor applies everywhere
+_EXTRACTORS: List[Tuple[Tuple[str, ...], Extractor]] = []
+
+
+def register_extractor(*domains: str) -> Callable[[Extractor], Extractor]:
+    """Register an extractor for the given domains (and their subdomains), or all pages if none"""
+    def decorator(func: Extractor) -> Extractor:
+        _EXTRACTORS.append((tuple(domains), func))
+        return func
+    return decorator
+
+
+def _matches(host: str, domains: Tuple[str, ...]) -> bool:
+    if not domains:
+        return True
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def _text(soup: BeautifulSoup, selector: str) -> str:
+    element = soup.select_one(selector)
+    return element.get_text(' ', strip=True) if element else ''
+
+
+def extract_job_details(url: str, html: str) -> Optional[Dict[str, str]]:
+    """Return job details parsed deterministically from the page, or None if nothing was found.
+
+    Site-specific extractors run first; generic ones (like JSON-LD) only fill in fields
+    that are still missing.
+    """
+    if not html:
+        return None
+    return extract_job_details_from_soup(url, BeautifulSoup(html, 'html.parser'))
+
+
+def extract_job_details_from_soup(url: str, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+    """Like extract_job_details for an already parsed page"""
+    host = (urlparse(url).hostname or '').lower()
+
+    details: Dict[str, str] = {}
+    ordered = sorted(_EXTRACTORS, key=lambda item: not item[0])  # site-specific before generic
+    for domains, extractor in ordered:
+        if not _matches(host, domains):
+            continue
+        try:
+            found = extractor(url, soup)
+        except Exception as e:
+            print(f"Structured extractor {extractor.__name__} failed: {str(e)}")
+            continue
+        for field in DETAIL_FIELDS:
+            value = (found.get(field) or '').strip()
+            if value and not details.get(field):
+                details[field] = value
+        if all(details.get(field) for field in DETAIL_FIELDS):
+            break
+
+    return details or None
+
+
+@register_extractor()
+def extract_json_ld(url: str, soup: BeautifulSoup) -> Dict[str, str]:
+    """schema.org JobPosting embedded as JSON-LD (Ashby, Workday, many career sites)"""
+    posting = find_job_posting(soup)
+    if not posting:
+        return {}
+
+    organization = posting.get('hiringOrganization')
+    company = organization.get('name') if isinstance(organization, dict) else organization
+
+    locations = posting.get('jobLocation')
+    if isinstance(locations, dict):
+        locations = [locations]
+    location = ''
+    for item in locations or []:
+        address = item.get('address') if isinstance(item, dict) else None
+        if isinstance(address, dict):
+            location = ', '.join(str(address[key]) for key in ('addressLocality', 'addressRegion', 'addressCountry')
+                                 if isinstance(address.get(key), str))
+            if location:
+                break
+
+    return {
+        'company': company if isinstance(company, str) else '',
+        'position': posting.get('title') or '',
+        'location': location,
+    }
+
+
+@register_extractor('greenhouse.io')
+def extract_greenhouse(url: str, soup: BeautifulSoup) -> Dict[str, str]:
+    """Greenhouse hosted job boards (classic and job-boards layouts)"""
+    company = _text(soup, '.company-name')
+    company = re.sub(r'^at\s+', '', company, flags=re.IGNORECASE)
+    return {
+        'company': company,
+        'position': _text(soup, 'h1.app-title') or _text(soup, '.job__title h1') or _text(soup, 'h1'),
+        'location': _text(soup, '.location') or _text(soup, '.job__location'),
+    }
+
+
+@register_extractor('lever.co')
+def extract_lever(url: str, soup: BeautifulSoup) -> Dict[str, str]:
+    """Lever job pages; the page title reads "<Company> - <Position>" """
+    company = ''
+    title = soup.title.get_text(strip=True) if soup.title else ''
+    if ' - ' in title:
+        company = title.split(' - ', 1)[0]
+    return {
+        'company': company,
+        'position': _text(soup, '.posting-headline h2'),
+        'location': _text(soup, '.posting-categories .location') or _text(soup, '.posting-categories .sort-by-time'),
+    }
+
+
+@register_extractor('linkedin.com')
+def extract_linkedin(url: str, soup: BeautifulSoup) -> Dict[str, str]:
+    """LinkedIn public (guest) job view pages"""
+    return {
+        'company': _text(soup, 'a.topcard__org-name-link') or _text(soup, '.topcard__flavor a'),
+        'position': _text(soup, 'h1.top-card-layout__title') or _text(soup, 'h1.topcard__title'),
+        'location': _text(soup, 'span.topcard__flavor--bullet'),
+    }
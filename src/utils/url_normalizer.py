@@ -0,0 +1,90 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that only identify how a link was shared, never which job it is. The canonical
+# URL is also the one fetched, so generic names a site might route on (ref, src, source, ...) stay.
+TRACKING_PARAMS = {
+    'gh_src', 'trackingid', 'refid', 'trk', 'trkinfo', 'lipi', 'midtoken', 'midsig',
+    'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', '_hsenc', '_hsmi',
+    'lever-source', 'lever-origin', 'lever-source[]',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+_LINKEDIN_JOB_PATH = re.compile(r'^/jobs/view/(?:[^/]*?-)?(\d+)/?')
+_GREENHOUSE_JOB_PATH = re.compile(r'^/([^/]+)/jobs/(\d+)')
+# Lever and Ashby both address a posting as /<company>/<uuid>
+_UUID_JOB_PATH = re.compile(r'^/([^/]+)/([0-9a-f-]{36})')
+
+
+def _is_tracking_param(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+
+
+def _canonical_ats_url(host: str, path: str, params: dict) -> str:
+    """Reduce known ATS job URLs to their stable job id form, or return an empty string"""
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        job_id = params.get('currentJobId')
+        match = _LINKEDIN_JOB_PATH.match(path)
+        if match:
+            job_id = match.group(1)
+        if job_id and job_id.isdigit():
+            return f"https://www.linkedin.com/jobs/view/{job_id}"
+
+    if host in ('boards.greenhouse.io', 'job-boards.greenhouse.io'):
+        match = _GREENHOUSE_JOB_PATH.match(path)
+        if match:
+            return f"https://boards.greenhouse.io/{match.group(1)}/jobs/{match.group(2)}"
+        if path.startswith('/embed/job_app') and params.get('for') and params.get('token'):
+            return f"https://boards.greenhouse.io/{params['for']}/jobs/{params['token']}"
+
+    if host == 'jobs.lever.co':
+        match = _UUID_JOB_PATH.match(path)
+        if match:
+            return f"https://jobs.lever.co/{match.group(1)}/{match.group(2)}"
+
+    if host == 'jobs.ashbyhq.com':
+        match = _UUID_JOB_PATH.match(path)
+        if match:
+            return f"https://jobs.ashbyhq.com/{match.group(1)}/{match.group(2)}"
+
+    return ""
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a job URL so the same posting always maps to the same string"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not _is_tracking_param(name)]
+
+    ats_url = _canonical_ats_url(host, parts.path, dict(query))
+    if ats_url:
+        return ats_url
+
+    # Keep explicit non-default ports, drop the default ones
+    netloc = host
+    try:
+        port = parts.port
+    except ValueError:
+        return url
+    if port and not ((parts.scheme == 'http' and port == 80) or
+                     (parts.scheme == 'https' and port == 443)):
+        netloc = f"{host}:{port}"
+
+    path = parts.path
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+
+    # Fragments are usually in-page anchors, except for hash-routed single page apps
+    fragment = parts.fragment if parts.fragment.startswith(('/', '!')) else ''
+
+    return urlunsplit((parts.scheme.lower(), netloc, path or '/', urlencode(sorted(query)), fragment))
@@ -1,32 +1,94 @@
-from typing import List, Dict, Any, Optional, Type, Union, Tuple
+from typing import List, Dict, Any, Optional, Type, Union, Tuple, AsyncIterator, Coroutine, TypeVar
 from pydantic import BaseModel, Field
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
+from crawl4ai import BrowserConfig, CrawlerRunConfig, CacheMode
+from bs4 import BeautifulSoup
 import asyncio
-import aiofiles
 import re
 import random
 from functools import lru_cache
 from pathlib import Path
 import os
 import hashlib
+import threading
+import atexit
+import weakref
+import concurrent.futures
+import time
+from urllib.parse import urlparse
+from .browser_pool import BrowserPool
+from .crawl_cache import CrawlCache
+from .content_cleaner import clean_crawled_content
+from .http_fetcher import HttpFetcher, html_to_markdown
+from .metrics import get_metrics
+from .rate_limiter import CircuitBreaker, DomainRateLimiter, backoff_delay
+from .url_normalizer import canonicalize_url
+from .write_behind import ContentAddressedStore
+from .section_classifier import classify_sections
+from .single_flight import AsyncSingleFlight
+from .structured_extractors import extract_job_details, extract_job_details_from_soup
+
+T = TypeVar('T')
+
+# Crawlers not yet closed; one exit hook closes them all instead of one hook per instance
+_open_crawlers: "weakref.WeakSet[WebCrawler]" = weakref.WeakSet()
+
+
+def _close_open_crawlers() -> None:
+    for crawler in list(_open_crawlers):
+        crawler.close()
+
+
+atexit.register(_close_open_crawlers)
+
+# Cleaned job descriptions are stored by content hash next to the crawl cache
+CLEANED_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "cache"
+_cleaned_store = ContentAddressedStore(CLEANED_CACHE_DIR, prefix="cleaned_",
+                                       header="<!-- Cleaned Job Description -->\n\n")
+
 
 class WebCrawler:
     """Class to handle web page crawling for job descriptions"""
     
-    def __init__(self):
-        self.max_concurrent = 1  # Only need one URL at a time for job descriptions
+    def __init__(self, cache_dir: Optional[Path] = None, browser_fallback: bool = True):
+        self.browser_fallback = browser_fallback  # False: never launch a browser (offline benchmarks)
+        self.max_concurrent = 4  # Upper bound on simultaneous crawls (and pooled browsers)
+        self.max_per_domain = 2  # Keep bulk crawls polite towards any single job board
         self.max_retries = 3
-        self.retry_delay = 1  # Reduced from 2 to 1 second
+        self.retry_delay = 1  # Base delay for exponential backoff between attempts
+        self.max_retry_delay = 30
+        self.max_pages_per_browser = 50  # Recycle browsers periodically to bound memory growth
         self._browser_config = self._create_browser_config()
         self._crawl_config = self._create_crawl_config()
+        self._browser_pool = BrowserPool(
+            self._browser_config,
+            max_size=self.max_concurrent,
+            max_pages_per_browser=self.max_pages_per_browser
+        )
+        self._http_fetcher = HttpFetcher()
+        self._rate_limiter = DomainRateLimiter()
+        self._circuit_breaker = CircuitBreaker()
+        # One long-lived event loop on a dedicated thread owns all async resources
+        # (browser pool, in-flight crawls); other threads hand it work via submit()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        # Crawls started from sync callers, keyed by canonical URL, so a second request joins the first
+        self._inflight: Dict[str, "concurrent.futures.Future[str]"] = {}
+        self._inflight_lock = threading.Lock()
+        # Crawls of the same URL that overlap on the loop (crawl_many, sync callers) share one crawl
+        self._crawl_flights = AsyncSingleFlight()
+        self._prefetch: Optional[Tuple[str, "concurrent.futures.Future[str]"]] = None
+        self.prefetch_delay = 0.5  # Debounce: the URL box fires a change event per keystroke
+        _open_crawlers.add(self)
         
         # Set up paths for caching
         self.base_path = Path(__file__).parent.parent.parent
         self.data_path = self.base_path / "src" / "data"
-        self.cache_path = self.data_path / "cache"
+        self.cache_path = Path(cache_dir) if cache_dir else self.data_path / "cache"
         
         # Create directories if they don't exist
         os.makedirs(self.cache_path, exist_ok=True)
+        self._cache = CrawlCache(self.cache_path)
     
     def _create_browser_config(self) -> BrowserConfig:
         """Create and cache browser configuration"""
@@ -60,109 +122,130 @@ class WebCrawler:
     
     def _clean_content_for_cache(self, content: str) -> str:
         """Clean the content before saving to cache to remove unwanted elements"""
-        # Remove footer sections that often contain unwanted links
-        footer_patterns = [
-            r'(?i)<footer.*?>.*?</footer>',
-            r'(?i)<!-- footer.*?-->.*?<!-- end footer -->',
-            r'(?i)---+\s*footer\s*---+.*?(?=\n\n|\Z)',
-            r'(?i)## footer.*?(?=\n##|\Z)',
-        ]
-        
-        for pattern in footer_patterns:
-            content = re.sub(pattern, '', content, flags=re.DOTALL)
+        return clean_crawled_content(content)
+    
+    async def crawl_url(self, url: str, refresh: bool = False) -> str:
+        """Crawl a single URL and return the content.
+
+        With refresh=True the fresh-cache check is skipped; a cached copy is still
+        reused if the server reports it unchanged. A crawl of the same URL already in
+        progress is joined rather than repeated.
+        """
+        # Tracking parameters never change the posting, so crawl the canonical form
+        url = canonicalize_url(url)
+        return await self._crawl_flights.do((url, refresh), lambda: self._timed_crawl_url(url, refresh))
+    
+    async def _timed_crawl_url(self, url: str, refresh: bool) -> str:
+        start = time.monotonic()
+        error = True
+        try:
+            content = await self._crawl_url(url, refresh)
+            # Failures are reported as error strings rather than raised
+            error = content.startswith("Error")
+            return content
+        finally:
+            get_metrics().record_call("crawler", "crawl", time.monotonic() - start, error=error)
+    
+    async def _crawl_url(self, url: str, refresh: bool) -> str:
+        # Check if we have a cached version
+        if not refresh:
+            cached_content = await asyncio.to_thread(self._cache.get, url)
+            get_metrics().record_cache("crawler", "cache", cached_content is not None)
+            if cached_content is not None:
+                print(f"Using cached content for: {url}")
+                return cached_content
         
-        # Remove navigation, cookie notices, and other common unwanted elements
-        unwanted_sections = [
-            r'(?i)<nav.*?>.*?</nav>',
-            r'(?i)cookie policy.*?(?=\n\n|\Z)',
-            r'(?i)privacy policy.*?(?=\n\n|\Z)',
-            r'(?i)terms of (use|service).*?(?=\n\n|\Z)',
-            r'(?i)copyright ©.*?(?=\n\n|\Z)',
-            r'(?i)all rights reserved.*?(?=\n\n|\Z)',
-            r'(?i)follow us on.*?(?=\n\n|\Z)',
-            r'(?i)share this job.*?(?=\n\n|\Z)',
-        ]
+        # An expired copy can still be revalidated instead of re-downloaded
+        stale = await asyncio.to_thread(self._cache.get_stale, url)
+        stale_meta = stale[1] if stale else {}
         
-        for pattern in unwanted_sections:
-            content = re.sub(pattern, '', content, flags=re.DOTALL)
+        domain = urlparse(url).netloc.lower()
         
-        # Remove social media links and icons
-        content = re.sub(r'(?i)(facebook|twitter|linkedin|instagram|youtube)\.com', '', content)
+        # Most ATS pages serve the posting in the initial HTML or as JSON-LD, so try a
+        # plain HTTP fetch first and only drive the browser when that comes back thin
+        await self._rate_limiter.acquire(domain)
+        response = await asyncio.to_thread(
+            self._http_fetcher.fetch, url, stale_meta.get('etag'), stale_meta.get('last_modified')
+        )
+        if response and response['status'] == 304 and stale:
+            print(f"Not modified, reusing cached content for: {url}")
+            self._circuit_breaker.record_success(domain)
+            await asyncio.to_thread(self._cache.touch, url)
+            return stale[0]
+        if response and response['status'] in (403, 429):
+            self._circuit_breaker.record_failure(domain)
+        if response and response['html']:
+            fast_content, details = await asyncio.to_thread(self._parse_fetched_page, url, response['html'])
+            if fast_content:
+                print(f"Fetched without browser: {url}")
+                self._circuit_breaker.record_success(domain)
+                return await self._store_crawled(
+                    url, fast_content, stale, etag=response['etag'], last_modified=response['last_modified'],
+                    details=details
+                )
         
-        # Remove excessive newlines while preserving paragraph structure
-        content = re.sub(r'\n{3,}', '\n\n', content)
+        if not self.browser_fallback:
+            if response and response['html']:
+                return self._clean_content_for_cache(html_to_markdown(response['html']))
+            status = response['status'] if response else 'no response'
+            return f"Error crawling URL: no usable content without a browser (HTTP {status})"
         
-        return content.strip()
-    
-    async def crawl_url(self, url: str) -> str:
-        """Crawl a single URL and return the content"""
-        # Check if we have a cached version
-        cache_file = self._get_cache_file_path(url)
-        if cache_file.exists():
-            async with aiofiles.open(cache_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                print(f"Using cached content for: {url}")
-                return content
-                
-        crawler = None
         for attempt in range(self.max_retries):
+            # Don't keep hammering a domain that is currently blocking us
+            if self._circuit_breaker.is_open(domain):
+                return self._blocked_fallback(url, domain, response, stale)
+            
             try:
-                # Add minimal delay between attempts
+                # Back off exponentially, with jitter so concurrent retries spread out
                 if attempt > 0:
                     print(f"Retrying {attempt+1}/{self.max_retries} for URL: {url}")
-                    await asyncio.sleep(self.retry_delay * attempt)
+                    await asyncio.sleep(backoff_delay(attempt - 1, self.retry_delay, self.max_retry_delay))
                 
-                crawler = AsyncWebCrawler(config=self._browser_config)
-                await crawler.start()
+                await self._rate_limiter.acquire(domain)
                 
-                # Removed unnecessary sleep after browser start
-                
-                result = await crawler.arun(
-                    url=url,
-                    config=self._crawl_config,
-                    session_id=f"job_description_{attempt}_{random.randint(1000, 9999)}",
-                    headers={
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                        'Accept-Language': 'en-US,en;q=0.5',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'none',
-                        'Sec-Fetch-User': '?1',
-                        'Cache-Control': 'max-age=0'
-                    }
-                )
+                # Lease a warm browser instead of launching one per attempt.
+                # No session_id is passed so crawl4ai closes the page afterwards
+                # rather than keeping it open on the shared browser.
+                async with self._browser_pool.lease() as crawler:
+                    result = await crawler.arun(
+                        url=url,
+                        config=self._crawl_config,
+                        headers={
+                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                            'Accept-Language': 'en-US,en;q=0.5',
+                            'Accept-Encoding': 'gzip, deflate, br',
+                            'DNT': '1',
+                            'Connection': 'keep-alive',
+                            'Upgrade-Insecure-Requests': '1',
+                            'Sec-Fetch-Dest': 'document',
+                            'Sec-Fetch-Mode': 'navigate',
+                            'Sec-Fetch-Site': 'none',
+                            'Sec-Fetch-User': '?1',
+                            'Cache-Control': 'max-age=0'
+                        }
+                    )
                 
                 if result.success:
+                    self._circuit_breaker.record_success(domain)
+                    details = None
+                    if getattr(result, 'html', None):
+                        details = await asyncio.to_thread(extract_job_details, url, result.html)
                     # Handle different result formats safely
                     if hasattr(result, 'markdown') and result.markdown_v2:
                         content = result.markdown_v2.raw_markdown
-                        # Clean content before saving to cache
-                        cleaned_content = self._clean_content_for_cache(content)
-                        # Save to cache
-                        await self._save_to_cache(url, cleaned_content)
-                        # Ensure browser is properly closed before returning
-                        await crawler.close()
-                        return cleaned_content
+                        # Clean and cache the content unless it matches the cached copy
+                        return await self._store_crawled(url, content, stale, details=details)
                     elif hasattr(result, 'text') and result.text:
                         content = result.text
-                        # Clean content before saving to cache
-                        cleaned_content = self._clean_content_for_cache(content)
-                        # Save to cache
-                        await self._save_to_cache(url, cleaned_content)
-                        await crawler.close()
-                        return cleaned_content
+                        return await self._store_crawled(url, content, stale, details=details)
                     elif hasattr(result, 'html') and result.html:
                         return f"HTML content retrieved (no markdown available): {url}"
                     else:
                         return f"Content retrieved but format unknown: {url}"
 
                 if "blocked" in str(result.error_message).lower():
-                    print(f"Attempt {attempt + 1} blocked, retrying after delay...")
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
+                    print(f"Attempt {attempt + 1} blocked")
+                    self._circuit_breaker.record_failure(domain)
                     continue
                     
                 print(f"Failed: {url} - Error: {result.error_message}")
@@ -171,52 +254,229 @@ class WebCrawler:
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed with error: {str(e)}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay * (attempt + 1))
                     continue
                 return f"Error crawling URL after {self.max_retries} attempts: {str(e)}"
 
-            finally:
-                await crawler.close()
-
         return "Error: Maximum retry attempts reached"
     
-    def fetch_job_description(self, url: str) -> str:
-        """Synchronous wrapper for crawl_url"""
+    def _blocked_fallback(self, url: str, domain: str, response: Optional[Dict[str, Any]],
+                          stale: Optional[Tuple[str, Dict[str, Any]]]) -> str:
+        """Best available content for a domain whose circuit is open, without using the browser"""
+        if stale:
+            print(f"{domain} is blocking requests, serving expired cached content for: {url}")
+            return stale[0]
+        if response and response['html']:
+            content = html_to_markdown(response['html'])
+            if content:
+                print(f"{domain} is blocking requests, using plain HTTP content for: {url}")
+                return self._clean_content_for_cache(content)
+        return f"Error crawling URL: {domain} is temporarily blocking requests. Please try again later or paste the job description manually."
+    
+    def _parse_fetched_page(self, url: str, html: str) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
+        """Parse fetched HTML once into (markdown or None if a browser is needed, structured details)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        # Extract before converting: the conversion strips the JSON-LD script tags
+        details = extract_job_details_from_soup(url, soup)
+        return self._http_fetcher.soup_to_job_markdown(soup), details
+    
+    async def _store_crawled(self, url: str, raw_content: str, stale: Optional[Tuple[str, Dict[str, Any]]],
+                             etag: Optional[str] = None, last_modified: Optional[str] = None,
+                             details: Optional[Dict[str, str]] = None) -> str:
+        """Clean and cache fetched content, reusing the cached copy if the content hash is unchanged"""
+        content_hash = hashlib.sha256(raw_content.encode('utf-8')).hexdigest()
+        if stale and stale[1].get('content_hash') == content_hash:
+            print(f"Content unchanged, reusing cached content for: {url}")
+            await asyncio.to_thread(self._cache.touch, url, etag, last_modified, details)
+            return stale[0]
+        
+        cleaned_content = self._clean_content_for_cache(raw_content)
+        await self._save_to_cache(url, cleaned_content, etag=etag, last_modified=last_modified,
+                                  content_hash=content_hash, details=details)
+        return cleaned_content
+    
+    def get_job_details(self, url: str) -> Optional[Dict[str, str]]:
+        """Return structured job details (company, position, location) found while crawling"""
+        metadata = self._cache.get_metadata(url)
+        return metadata.get('details') if metadata else None
+    
+    async def crawl_many(self, urls: List[str], refresh: bool = False) -> AsyncIterator[Tuple[str, str]]:
+        """Crawl several URLs concurrently, yielding (url, content) as each one completes"""
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        async def crawl_one(url: str) -> Tuple[str, str]:
+            invalid = self._validate_url(url)
+            if invalid is not None:
+                return url, invalid
+            domain = urlparse(url).netloc.lower()
+            domain_semaphore = domain_semaphores.setdefault(domain, asyncio.Semaphore(self.max_per_domain))
+            # Wait on the domain cap first so a busy domain doesn't hold global slots
+            async with domain_semaphore:
+                async with semaphore:
+                    try:
+                        return url, await self.crawl_url(url, refresh=refresh)
+                    except Exception as e:
+                        return url, f"Error crawling URL: {str(e)}"
+        
+        # Drop duplicates (including links that differ only in tracking params)
+        # but keep the caller's order for scheduling
+        unique_urls = {}
+        for url in urls:
+            unique_urls.setdefault(canonicalize_url(url) if url else url, url)
+        tasks = [asyncio.ensure_future(crawl_one(url)) for url in unique_urls.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding crawls if the consumer stops iterating early
+            for task in tasks:
+                task.cancel()
+    
+    def fetch_job_descriptions(self, urls: List[str], refresh: bool = False) -> Dict[str, str]:
+        """Synchronous wrapper for crawl_many, returning content keyed by URL"""
+        async def collect() -> Dict[str, str]:
+            return {url: content async for url, content in self.crawl_many(urls, refresh=refresh)}
+        
+        crawled = self.submit(collect()).result()
+        
+        # Links to the same posting were crawled once; give every input URL its result
+        by_canonical = {canonicalize_url(url) if url else url: content for url, content in crawled.items()}
+        return {url: by_canonical[canonicalize_url(url) if url else url] for url in urls}
+    
+    def refresh_cached_postings(self) -> List[str]:
+        """Revalidate every cached posting and return the URLs whose content changed"""
+        urls = self._cache.urls()
+        hashes_before = {url: (self._cache.get_metadata(url) or {}).get('content_hash') for url in urls}
+        self.fetch_job_descriptions(urls, refresh=True)
+        return [url for url in urls
+                if (self._cache.get_metadata(url) or {}).get('content_hash') != hashes_before[url]]
+    
+    @staticmethod
+    def _validate_url(url: str) -> Optional[str]:
+        """Return an error message for an unusable URL, or None if it looks valid"""
         if not url or not url.strip():
             return ""
-            
         if not (url.startswith("http://") or url.startswith("https://")):
             return "Invalid URL. Please enter a URL starting with http:// or https://"
+        return None
+    
+    def fetch_job_description(self, url: str) -> str:
+        """Synchronous wrapper for crawl_url"""
+        invalid = self._validate_url(url)
+        if invalid is not None:
+            return invalid
             
         try:
-            return asyncio.run(self.crawl_url(url))
+            return self._crawl_shared(url).result()
         except Exception as e:
             return f"Error crawling URL: {str(e)}"
     
+    def prefetch(self, url: str) -> None:
+        """Start crawling a URL in the background so a later fetch finds it cached or in flight.
+        
+        A newer prefetch cancels the previous one unless a caller is already waiting on it.
+        """
+        url = (url or '').strip()
+        if self._validate_url(url) is not None or '.' not in (urlparse(url).hostname or ''):
+            self._cancel_prefetch()
+            return
+        key = canonicalize_url(url)
+        with self._inflight_lock:
+            current = self._prefetch
+            if current and current[0] == key:
+                return
+        self._cancel_prefetch()
+        
+        future = self._crawl_shared(url, delay=self.prefetch_delay)
+        with self._inflight_lock:
+            self._prefetch = (key, future)
+    
+    def _cancel_prefetch(self) -> None:
+        with self._inflight_lock:
+            current, self._prefetch = self._prefetch, None
+        if current and not current[1].done():
+            print(f"Cancelling prefetch of {current[0]}")
+            current[1].cancel()
+    
+    def _crawl_shared(self, url: str, delay: float = 0) -> "concurrent.futures.Future[str]":
+        """Return the in-flight crawl of this URL, starting one if there is none"""
+        key = canonicalize_url(url)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None and not future.cancelled():
+                if self._prefetch and self._prefetch[0] == key and not delay:
+                    # Someone is now waiting on the prefetch; it must not be cancelled any more
+                    self._prefetch = None
+                return future
+            
+            future = self.submit(self._delayed_crawl(url, delay) if delay else self.crawl_url(url))
+            self._inflight[key] = future
+        
+        def forget(done: "concurrent.futures.Future[str]") -> None:
+            with self._inflight_lock:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+        future.add_done_callback(forget)
+        return future
+    
+    async def _delayed_crawl(self, url: str, delay: float) -> str:
+        await asyncio.sleep(delay)
+        return await self.crawl_url(url)
+    
+    def submit(self, work: Union[str, Coroutine[Any, Any, T]]) -> "concurrent.futures.Future[T]":
+        """Schedule a crawl (a URL) or any coroutine on the crawler's event loop.
+        
+        Safe to call from any thread; returns a concurrent.futures.Future.
+        """
+        coro = self.crawl_url(work) if isinstance(work, str) else work
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("submit() must not be called from the crawler's own event loop; await instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._run_loop, args=(loop,), name="WebCrawlerLoop", daemon=True)
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
+    
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+    
+    def close(self) -> None:
+        """Shut down pooled browsers and stop the crawler's event loop"""
+        _open_crawlers.discard(self)
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop, self._loop_thread = None, None
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._browser_pool.close(), loop).result(timeout=30)
+            except Exception as e:
+                print(f"Error closing browser pool: {str(e)}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            if not thread.is_alive():
+                loop.close()
+        self._http_fetcher.close()
+        self._cache.flush()
+        _cleaned_store.writer.flush()
+    
     @staticmethod
     def clean_job_description(content: str) -> str:
         """Clean and format job description from crawled content"""
         if not content or content.startswith("Error"):
             return content
             
-        # Look for sections that might contain job description
-        job_sections = []
-        sections = re.split(r'\n#{1,3} ', content)
-        
-        # Expanded keywords to include title and company info
-        keywords = [
-            'job title', 'company', 'location',  # Added job metadata keywords
-            'job description', 'responsibilities', 'requirements', 
-            'qualifications', 'about the role', 'about the position',
-            'what you\'ll do', 'what we\'re looking for', 'overview',
-            'about us', 'about the company', 'position summary', 'jobs-details'
-        ]
-                   
-        for section in sections:
-            section_lower = section.lower()
-            # Keep sections with keywords or the first section (usually contains title)
-            if any(keyword in section_lower for keyword in keywords) or section == sections[0]:
-                job_sections.append(section)
+        # Keep the first section (usually the title) and any section labelled as part of the posting
+        job_sections = [section.text for section in classify_sections(content) if section.keep]
                 
         # If we found specific job sections, use them
         if job_sections:
@@ -235,43 +495,13 @@ class WebCrawler:
         content_lines = processed_content.splitlines()
         limited_content = '\n'.join(content_lines[:100])
         
-        # Save the cleaned job description to a cache file
-        # Note: This is a static method, so we need to create a unique filename
-        # without access to self.cache_path
-        try:
-            # Generate a unique filename based on content hash
-            content_hash = hashlib.md5(limited_content.encode()).hexdigest()
-            base_path = Path(__file__).parent.parent.parent
-            cache_path = base_path / "src" / "data" / "cache"
-            cache_file = cache_path / f"cleaned_{content_hash}.md"
-            
-            # Ensure the cache directory exists
-            os.makedirs(cache_path, exist_ok=True)
-            
-            # Save the cleaned content to the cache file
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                f.write("<!-- Cleaned Job Description -->\n\n")
-                f.write(limited_content)
-            print(f"Saved cleaned job description to cache: {cache_file}")
-        except Exception as e:
-            print(f"Error saving cleaned job description to cache: {str(e)}")
+        # Persist a copy for inspection; the write happens in the background and only once per content
+        path = _cleaned_store.save(limited_content)
+        print(f"Queued cleaned job description for cache: {path}")
             
         return limited_content
 
-    def _get_cache_file_path(self, url: str) -> Path:
-        """Generate a unique filename for the URL cache"""
-        # Create a hash of the URL to use as filename
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        return self.cache_path / f"{url_hash}.md"
-    
-    async def _save_to_cache(self, url: str, content: str) -> None:
-        """Save the crawled content to a markdown file"""
-        cache_file = self._get_cache_file_path(url)
-        try:
-            async with aiofiles.open(cache_file, 'w', encoding='utf-8') as f:
-                # Add URL as a comment at the top of the file
-                await f.write(f"<!-- Source URL: {url} -->\n\n")
-                await f.write(content)
-            print(f"Saved content to cache: {cache_file}")
-        except Exception as e:
-            print(f"Error saving to cache: {str(e)}")
\ No newline at end of file
+    async def _save_to_cache(self, url: str, content: str, **metadata: Any) -> None:
+        """Save the crawled content and its revalidation metadata to the crawl cache"""
+        # Disk writes and index updates happen off the event loop
+        await asyncio.to_thread(self._cache.put, url, content, **metadata)
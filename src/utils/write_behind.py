@@ -0,0 +1,104 @@
+import atexit
+import hashlib
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+
+class WriteBehindQueue:
+    """Writes files on a background thread, in batches, so callers never wait on disk I/O"""
+
+    def __init__(self, batch_size: int = 32, batch_wait: float = 0.5):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue: "queue.Queue[Optional[Tuple[Path, bytes]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def submit(self, path: Path, data: bytes) -> None:
+        """Queue a file write and return immediately"""
+        self._ensure_thread()
+        self._queue.put((Path(path), data))
+
+    def flush(self) -> None:
+        """Block until every queued write has been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=10)
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="WriteBehindQueue", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch: List[Optional[Tuple[Path, bytes]]] = [item]
+            # Gather whatever else arrives shortly after so a burst costs one wake-up
+            while item is not None and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.batch_wait)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            for entry in batch:
+                if entry is not None:
+                    self._write(*entry)
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        """Write to a temporary file and rename it into place"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing {path}: {str(e)}")
+
+
+class ContentAddressedStore:
+    """Stores text under a hash of its content; identical content is only ever written once"""
+
+    def __init__(self, directory: Path, prefix: str = "", header: str = "",
+                 writer: Optional[WriteBehindQueue] = None):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.header = header
+        self.writer = writer or WriteBehindQueue()
+        self._known: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def path_for(self, content: str) -> Path:
+        content_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+        return self.directory / f"{self.prefix}{content_hash}.md"
+
+    def save(self, content: str) -> Path:
+        """Queue content for writing unless it is already stored, and return its path"""
+        path = self.path_for(content)
+        with self._lock:
+            if path.name in self._known:
+                return path
+            self._known.add(path.name)
+        # Only the first save of each hash in this process touches the filesystem
+        if not path.exists():
+            self.writer.submit(path, (self.header + content).encode('utf-8'))
+        return path
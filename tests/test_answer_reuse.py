@@ -0,0 +1,97 @@
+import pytest
+
+from src.utils.answer_index import AnswerIndex
+from src.utils.generators.job_application_qna import JobApplicationQnA
+
+
+SCOPE = "job"
+
+
+def reusable(tmp_path, earlier, question, word_limit=None):
+    index = AnswerIndex(tmp_path / "index.json")
+    index.add(SCOPE, earlier, "Earlier answer.", word_limit)
+    return JobApplicationQnA.can_reuse(index.find(SCOPE, question), question, word_limit)
+
+
+@pytest.mark.parametrize("earlier, question", [
+    ("Why do you want to work here?", "why do you want to work here"),
+    ("Describe a time you led a team.", "Describe a time you led a team!"),
+    ("What is your   greatest strength?", "What is your greatest strength ?"),
+    ("What are your salary expectations?", "What are your salary expectations"),
+    ("Are you willing to work on weekends?", "Are you willing to work weekends?"),
+])
+def test_rewordings_are_reused(tmp_path, earlier, question):
+    assert reusable(tmp_path, earlier, question)
+
+
+@pytest.mark.parametrize("earlier, question", [
+    ("Describe a time you led a team.", "Describe a time you failed to lead a team."),
+    ("Are you willing to relocate?", "Are you not willing to relocate?"),
+    ("Have you ever been convicted of a crime?", "Have you never been convicted of a crime?"),
+])
+def test_negations_are_not_reused(tmp_path, earlier, question):
+    assert not reusable(tmp_path, earlier, question)
+
+
+@pytest.mark.parametrize("earlier, question", [
+    ("Are you authorized to work in the US?", "Are you authorized to work in Canada?"),
+    ("How many years of experience do you have with Java?", "How many years of experience do you have with Python?"),
+    ("What is your expected start date?", "What is your expected salary?"),
+    ("Why do you prefer Python over Java?", "Why do you prefer Java over Python?"),
+])
+def test_entity_swaps_are_not_reused(tmp_path, earlier, question):
+    assert not reusable(tmp_path, earlier, question)
+
+
+def test_answer_over_word_limit_is_not_reused(tmp_path):
+    index = AnswerIndex(tmp_path / "index.json")
+    index.add(SCOPE, "Why this role?", "A fairly long earlier answer here.")
+    similar = index.find(SCOPE, "Why this role?")
+    assert JobApplicationQnA.can_reuse(similar, "Why this role?", None)
+    assert not JobApplicationQnA.can_reuse(similar, "Why this role?", 3)
+
+
+def test_other_scopes_are_not_searched(tmp_path):
+    index = AnswerIndex(tmp_path / "index.json")
+    index.add("other job", "Why this role?", "Earlier answer.")
+    assert index.find(SCOPE, "Why this role?") is None
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def stream_text(self, prompt, generation_config=None, **kwargs):
+        self.prompts.append(prompt)
+        yield "New answer."
+
+
+@pytest.fixture
+def qna(tmp_path):
+    qna = JobApplicationQnA()
+    qna.cache_path = tmp_path
+    qna.answer_index = AnswerIndex(tmp_path / "index.json")
+    qna.llm = RecordingLLM()
+    return qna
+
+
+def answer(qna, question):
+    return list(qna.stream_answer("Resume: Python developer", "Job: backend engineer", question, "Acme", "Engineer"))[-1]
+
+
+def test_related_answer_is_adapted_with_resume_and_job_description(qna):
+    scope = qna.get_scope_key("Resume: Python developer", "Job: backend engineer", "Acme", "Engineer")
+    qna.answer_index.add(scope, "Describe a time you led a team.", "I led a team of five.")
+
+    assert answer(qna, "Describe a time you failed to lead a team.") == "New answer."
+    prompt = qna.llm.prompts[-1]
+    assert "I led a team of five." in prompt
+    assert "Resume: Python developer" in prompt and "Job: backend engineer" in prompt
+
+
+def test_unrelated_question_gets_a_plain_prompt(qna):
+    scope = qna.get_scope_key("Resume: Python developer", "Job: backend engineer", "Acme", "Engineer")
+    qna.answer_index.add(scope, "Describe a time you led a team.", "I led a team of five.")
+
+    answer(qna, "What is your expected salary?")
+    assert "I led a team of five." not in qna.llm.prompts[-1]